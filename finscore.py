@@ -0,0 +1,372 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------
+# FinScore scoring engine
+# -----------------------
+# The credit formula behind the hackathon.py modal, written over NumPy
+# arrays so the same code scores one applicant from the sliders or a whole
+# applicant file in a single pass.
+
+# Column names expected in applicant files, in formula order
+CREDIT_FACTORS = ["payment_history", "credit_utilization", "credit_history", "new_credit", "credit_mix"]
+
+CREDIT_MIN, CREDIT_MAX = 300, 850
+
+# Lower bound of every rating after "Poor"
+RATING_THRESHOLDS = np.array([580, 670, 740, 800])
+RATINGS = np.array(["Poor", "Fair", "Good", "Very Good", "Excellent"])
+RATING_COLORS = np.array(["#e74c3c", "#e67e22", "#f39c12", "#2ecc71", "#27ae60"])
+RATING_CLASSES = np.array(["result-danger", "result-warning", "result-warning", "result-success", "result-success"])
+
+
+def credit_score(payment_history, credit_utilization, credit_history, new_credit, credit_mix):
+    """FinScore (300-850) for scalars or equally shaped arrays of factors.
+
+    payment_history and credit_utilization are percentages, credit_history
+    is in years, new_credit and credit_mix are account counts.
+    """
+    payment_history = np.asarray(payment_history, dtype=np.float64)
+    credit_utilization = np.asarray(credit_utilization, dtype=np.float64)
+    credit_history = np.asarray(credit_history, dtype=np.float64)
+    new_credit = np.asarray(new_credit, dtype=np.float64)
+    credit_mix = np.asarray(credit_mix, dtype=np.float64)
+
+    # Factor weights: payment 35%, utilization 30%, history 15%, new credit 10%, mix 10%
+    payment_score = (payment_history / 100) * 35 * 10
+    utilization_score = (1 - np.minimum(credit_utilization, 100) / 100) * 30 * 10
+    history_score = (np.minimum(credit_history, 30) / 30) * 15 * 10
+    new_credit_score = (1 - np.minimum(new_credit, 10) / 10) * 10 * 10
+    mix_score = (np.minimum(credit_mix, 5) / 5) * 10 * 10
+
+    total = 300 + payment_score + utilization_score + history_score + new_credit_score + mix_score
+    return np.round(np.clip(total, CREDIT_MIN, CREDIT_MAX)).astype(np.int64)
+
+
+# Slider range of each factor in the hackathon.py credit form
+CREDIT_FACTOR_RANGES = {
+    "payment_history": (0, 100),
+    "credit_utilization": (0, 100),
+    "credit_history": (0, 50),
+    "new_credit": (0, 20),
+    "credit_mix": (0, 10),
+}
+
+
+def score_surface(x_factor, y_factor, base, steps=101):
+    """Scores over a grid of two factors with the others held at their base values.
+
+    Returns (x values, y values, scores) with scores shaped (len(y), len(x)).
+    Every factor is a whole number in the form, so an axis never gets more
+    points than its range has integers.
+    """
+    axes = []
+    for factor in (x_factor, y_factor):
+        lo, hi = CREDIT_FACTOR_RANGES[factor]
+        axes.append(np.linspace(lo, hi, min(steps, hi - lo + 1)))
+    xs, ys = axes
+    grid_x, grid_y = np.meshgrid(xs, ys)
+    factors = dict(base, **{x_factor: grid_x, y_factor: grid_y})
+    return xs, ys, credit_score(*(factors[c] for c in CREDIT_FACTORS))
+
+
+def rating_index(scores):
+    """Position of each score in RATINGS / RATING_COLORS / RATING_CLASSES."""
+    return np.searchsorted(RATING_THRESHOLDS, scores, side="right")
+
+
+# Factors given as percentages; every factor must be non-negative
+PERCENT_FACTORS = ["payment_history", "credit_utilization"]
+
+
+def score_applicants(df):
+    """Return (applicants with credit_score and rating columns, invalid rows with a reason)."""
+    missing = [c for c in CREDIT_FACTORS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    factors = df[CREDIT_FACTORS].apply(pd.to_numeric, errors="coerce")
+    reason = pd.Series("", index=df.index, dtype=object)
+    reason[(factors[PERCENT_FACTORS] > 100).any(axis=1)] = "percentage above 100"
+    reason[(factors < 0).any(axis=1)] = "negative factor"
+    reason[factors.isna().any(axis=1)] = "missing or non-numeric factor"
+    bad = (reason != "").to_numpy()
+
+    valid = df[~bad].assign(**{c: factors.loc[~bad, c] for c in CREDIT_FACTORS})
+    scores = credit_score(*(factors.loc[~bad, c].to_numpy() for c in CREDIT_FACTORS))
+    return valid.assign(credit_score=scores, rating=RATINGS[rating_index(scores)]), df[bad].assign(reason=reason[bad])
+
+
+def read_applicants(source, columns=CREDIT_FACTORS):
+    """Read only the needed columns of an applicant CSV."""
+    header = pd.read_csv(source, nrows=0).columns
+    if hasattr(source, "seek"):
+        source.seek(0)
+    keep = [c for c in header if c in columns or c == "applicant_id"]
+    # Read as text; score_applicants coerces and sends bad cells to the invalid table
+    return pd.read_csv(source, usecols=keep, dtype=str)
+
+
+# -----------------------
+# Tax brackets
+# -----------------------
+# Each filing status is a bracket table: upper bounds plus one marginal rate
+# per bracket. Tax already owed at the bottom of each bracket is precomputed,
+# so evaluating any number of incomes is one np.searchsorted plus one
+# multiply-add instead of an if/elif ladder per person.
+
+class TaxSchedule:
+    def __init__(self, thresholds, rates, labels=None):
+        """thresholds are bracket upper bounds (one fewer than rates)."""
+        self.rates = np.asarray(rates, dtype=np.float64)
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        if len(self.thresholds) != len(self.rates) - 1:
+            raise ValueError("Need exactly one fewer threshold than rates")
+        self.lower = np.concatenate([[0.0], self.thresholds])
+        self.base = np.concatenate([[0.0], np.cumsum(np.diff(self.lower) * self.rates[:-1])])
+        if labels is None:
+            labels = [f"{r:.0%}" for r in self.rates[:-1]] + [f"{self.rates[-1]:.0%}+"]
+        self.labels = np.asarray(labels)
+
+    def bracket_index(self, taxable_income):
+        # A bracket includes its upper bound, as in "taxable_income <= 11000"
+        return np.searchsorted(self.thresholds, taxable_income, side="left")
+
+    def tax(self, taxable_income):
+        taxable_income = np.asarray(taxable_income, dtype=np.float64)
+        idx = self.bracket_index(taxable_income)
+        return self.base[idx] + (taxable_income - self.lower[idx]) * self.rates[idx]
+
+
+# Simplified brackets for demonstration
+TAX_SCHEDULES = {
+    "Single": TaxSchedule([11000, 44725, 95375], [0.10, 0.12, 0.22, 0.24]),
+    "Married Filing Jointly": TaxSchedule([22000, 89450, 190750], [0.10, 0.12, 0.22, 0.24]),
+    "Head of Household": TaxSchedule([15700, 59850, 95350], [0.10, 0.12, 0.22, 0.24]),
+}
+
+
+def compute_tax(gross_income, deductions, filing_status, schedules=TAX_SCHEDULES):
+    """Taxable income, tax, bracket label and net income for arrays of filers.
+
+    filing_status may be one status for everyone or an array of statuses;
+    each distinct status is evaluated once over all of its filers.
+    """
+    gross_income = np.asarray(gross_income, dtype=np.float64)
+    taxable = gross_income - np.asarray(deductions, dtype=np.float64)
+    status = np.broadcast_to(np.asarray(filing_status, dtype=object), taxable.shape)
+
+    tax = np.full(taxable.shape, np.nan)
+    bracket = np.full(taxable.shape, "", dtype=object)
+    for name in pd.unique(status.ravel()):
+        if name not in schedules:
+            raise ValueError(f"Unknown filing status: {name}")
+        mask = status == name
+        schedule = schedules[name]
+        tax[mask] = schedule.tax(taxable[mask])
+        bracket[mask] = schedule.labels[schedule.bracket_index(taxable[mask])]
+
+    return {
+        "gross_income": gross_income,
+        "taxable_income": taxable,
+        "tax_bracket": bracket,
+        "tax_amount": tax,
+        "net_income": gross_income - tax,
+    }
+
+
+def tax_payroll(df, default_deductions=0.0, default_status="Single"):
+    """Add tax columns to a DataFrame with gross_income (and optional deductions, filing_status)."""
+    if "gross_income" not in df.columns:
+        raise ValueError("Missing column: gross_income")
+    deductions = df["deductions"].fillna(default_deductions) if "deductions" in df.columns else default_deductions
+    status = df["filing_status"].fillna(default_status).to_numpy() if "filing_status" in df.columns else default_status
+    result = compute_tax(df["gross_income"].to_numpy(), deductions, status)
+    return df.assign(**{k: v for k, v in result.items() if k != "gross_income"})
+
+
+# -----------------------
+# Insurance coverage
+# -----------------------
+# Coverage levels are mapped to integer codes once, so scoring any number of
+# policies is a single fancy-indexed lookup into a points table. Missing
+# coverage is tracked as a bitmask (one bit per policy type), and the
+# recommendation HTML for every possible mask is prebuilt below.
+
+# Policy column -> (coverage levels in code order, points per level, advice when uncovered)
+INSURANCE_POLICIES = {
+    "health": (["No Coverage", "Basic Coverage", "Comprehensive Coverage"], [0, 25, 35],
+               "Consider getting health insurance to protect against medical costs"),
+    "auto": (["No Coverage", "Liability Only", "Full Coverage"], [0, 15, 20],
+             "Auto insurance is legally required in most states"),
+    "home": (["No Coverage", "Renters Insurance", "Homeowners Insurance"], [0, 15, 25],
+             "Consider getting home/renters insurance to protect your property"),
+    "life": (["No Coverage", "Term Life", "Whole Life"], [0, 15, 20],
+             "Consider life insurance if you have dependents"),
+}
+POLICY_TYPES = list(INSURANCE_POLICIES)
+NO_COVERAGE = 0  # code of "No Coverage" for every policy type
+
+COVERAGE_POINTS = np.array([points for _, points, _ in INSURANCE_POLICIES.values()])
+COVERAGE_THRESHOLDS = np.array([40, 70])
+COVERAGE_CLASSES = np.array(["result-danger", "result-warning", "result-success"])
+
+# Missing-coverage mask -> "<h4>Recommendations:</h4><ul>...</ul>" (empty when fully covered)
+RECOMMENDATIONS_HTML = np.array([
+    "<h4>Recommendations:</h4><ul>" + "".join(
+        f"<li>{advice}</li>" for bit, (_, _, advice) in enumerate(INSURANCE_POLICIES.values()) if mask >> bit & 1
+    ) + "</ul>" if mask else ""
+    for mask in range(1 << len(POLICY_TYPES))
+], dtype=object)
+
+INSURANCE_RESULT_TEMPLATE = """
+        <div class="result-container {result_class}">
+            <h3>Insurance Coverage Results</h3>
+            <p><strong>Coverage Score:</strong> {score}/100</p>
+            {recommendations}
+        </div>
+        """
+
+
+def coverage_codes(policy, levels, strict=True):
+    """Integer codes for an array of coverage level strings.
+
+    Unknown levels raise, or get code -1 when strict is False.
+    """
+    names = INSURANCE_POLICIES[policy][0]
+    codes = pd.Categorical(np.asarray(levels, dtype=object).ravel(), categories=names).codes
+    if strict and (codes < 0).any():
+        bad = pd.unique(np.asarray(levels, dtype=object).ravel()[codes < 0])
+        raise ValueError(f"Unknown {policy} coverage: {', '.join(map(str, bad[:5]))}")
+    return codes.astype(np.int64)
+
+
+def insurance_score(codes):
+    """Return (scores, missing-coverage masks) for an (n, len(POLICY_TYPES)) code array."""
+    codes = np.atleast_2d(codes)
+    scores = COVERAGE_POINTS[np.arange(len(POLICY_TYPES)), codes].sum(axis=1)
+    masks = ((codes == NO_COVERAGE) << np.arange(len(POLICY_TYPES))).sum(axis=1)
+    return scores, masks
+
+
+def coverage_class(scores):
+    return COVERAGE_CLASSES[np.searchsorted(COVERAGE_THRESHOLDS, scores, side="right")]
+
+
+def render_insurance_result(score, mask):
+    return INSURANCE_RESULT_TEMPLATE.format(
+        result_class=coverage_class(score), score=int(score), recommendations=RECOMMENDATIONS_HTML[mask]
+    )
+
+
+def score_policies(df, strict=True):
+    """Add insurance_score and missing_coverage columns to a DataFrame with one column per policy type.
+
+    Unknown coverage levels raise, or with strict=False leave that row's
+    insurance_score as NaN.
+    """
+    missing = [c for c in POLICY_TYPES if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    codes = np.column_stack([
+        coverage_codes(p, df[p].fillna("No Coverage").astype(str).str.strip(), strict) for p in POLICY_TYPES
+    ])
+    known = (codes >= 0).all(axis=1)
+    scores, masks = insurance_score(np.where(known[:, None], codes, NO_COVERAGE))
+    if strict:
+        return df.assign(insurance_score=scores, missing_coverage=masks)
+    return df.assign(
+        insurance_score=np.where(known, scores, np.nan),
+        missing_coverage=pd.Series(masks, index=df.index, dtype="Int64").where(known),
+    )
+
+
+# -----------------------
+# Loan eligibility
+# -----------------------
+# Combines the credit, income/tax and insurance assessments for any number
+# of applicants. Each finding is one bit in a reason code, so a run over a
+# whole applicant file is a handful of array comparisons and ORs; text is
+# only produced by looking codes up in a table built once below.
+
+REASON_LOW_CREDIT = 1
+REASON_FAIR_CREDIT = 2
+REASON_LOW_INCOME = 4
+REASON_LOW_COVERAGE = 8
+REASON_MISSING_DATA = 16
+
+REASON_MESSAGES = {
+    REASON_LOW_CREDIT: "Credit score is too low (below 580)",
+    REASON_FAIR_CREDIT: "Credit score is fair, which may result in higher interest rates",
+    REASON_LOW_INCOME: "Income is relatively low, which may limit loan amount",
+    REASON_LOW_COVERAGE: "Insurance coverage is limited, which may affect loan terms",
+    REASON_MISSING_DATA: "Credit score, income or insurance data is missing or invalid",
+}
+
+# Reasons that make an applicant ineligible; the rest are notes
+BLOCKING_REASONS = REASON_LOW_CREDIT | REASON_MISSING_DATA
+
+MIN_CREDIT_SCORE, FAIR_CREDIT_SCORE = 580, 670
+LOW_INCOME = 30000
+LOW_COVERAGE_SCORE = 40
+
+# Every reason code -> its messages joined with "; "
+REASON_TEXT = np.array([
+    "; ".join(msg for bit, msg in REASON_MESSAGES.items() if code & bit)
+    for code in range(2 * max(REASON_MESSAGES))
+], dtype=object)
+
+
+def reason_list(code):
+    """Messages for a single reason code, in REASON_MESSAGES order."""
+    return [msg for bit, msg in REASON_MESSAGES.items() if int(code) & bit]
+
+
+def loan_eligibility(credit_scores, annual_income, insurance_score=None):
+    """Return (eligible bool array, reason code array) for arrays of applicants."""
+    credit_scores = np.asarray(credit_scores, dtype=np.float64)
+    annual_income = np.asarray(annual_income, dtype=np.float64)
+    # NaN compares False everywhere, so missing inputs get their own blocking bit
+    invalid = np.isnan(credit_scores) | np.isnan(annual_income)
+    invalid |= (credit_scores < CREDIT_MIN) | (credit_scores > CREDIT_MAX) | (annual_income < 0)
+
+    codes = np.where(credit_scores < MIN_CREDIT_SCORE, REASON_LOW_CREDIT,
+                     np.where(credit_scores < FAIR_CREDIT_SCORE, REASON_FAIR_CREDIT, 0)).astype(np.uint8)
+    codes |= np.where(annual_income < LOW_INCOME, REASON_LOW_INCOME, 0).astype(np.uint8)
+    if insurance_score is not None:
+        insurance_score = np.asarray(insurance_score, dtype=np.float64)
+        codes |= np.where(insurance_score < LOW_COVERAGE_SCORE, REASON_LOW_COVERAGE, 0).astype(np.uint8)
+        invalid = invalid | np.isnan(insurance_score)
+    codes |= np.where(invalid, REASON_MISSING_DATA, 0).astype(np.uint8)
+
+    eligible = (codes & BLOCKING_REASONS) == 0
+    return eligible, codes
+
+
+def assess_applicants(df, default_deductions=0.0, default_status="Single"):
+    """Run the full credit, tax and eligibility pipeline over an applicant DataFrame.
+
+    Needs gross_income and either a credit_score column or the CREDIT_FACTORS
+    columns; deductions, filing_status and insurance_score (or the
+    POLICY_TYPES coverage columns) are optional.
+    """
+    if "credit_score" not in df.columns:
+        # Rows whose factors cannot be scored stay in, with no credit_score
+        scored, invalid = score_applicants(df)
+        df = pd.concat([scored, invalid.drop(columns="reason")]).loc[df.index]
+    if "insurance_score" not in df.columns and all(p in df.columns for p in POLICY_TYPES):
+        # Unknown coverage labels leave insurance_score NaN -> REASON_MISSING_DATA
+        df = score_policies(df, strict=False)
+    # Unparseable numbers become NaN and are flagged REASON_MISSING_DATA below
+    numeric = [c for c in ("credit_score", "gross_income", "deductions", "insurance_score") if c in df.columns]
+    df = df.assign(**{c: pd.to_numeric(df[c], errors="coerce") for c in numeric})
+    df = tax_payroll(df, default_deductions, default_status)
+
+    insurance = df["insurance_score"].to_numpy() if "insurance_score" in df.columns else None
+    eligible, codes = loan_eligibility(df["credit_score"].to_numpy(), df["gross_income"].to_numpy(), insurance)
+    return df.assign(
+        eligible=eligible,
+        decision=np.where(eligible, "Approved", "Declined"),
+        reason_code=codes,
+        reasons=REASON_TEXT[codes],
+    )
@@ -1,6 +1,12 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import plotly.express as px
+from finscore import (COVERAGE_CLASSES, CREDIT_FACTORS, CREDIT_MAX, CREDIT_MIN, INSURANCE_POLICIES, POLICY_TYPES,
+                      RATINGS, RATING_CLASSES, RATING_COLORS, REASON_TEXT, TAX_SCHEDULES, assess_applicants,
+                      compute_tax, coverage_class, credit_score, insurance_score, loan_eligibility, rating_index,
+                      read_applicants, reason_list, render_insurance_result, score_applicants, score_policies,
+                      score_surface, tax_payroll)
 
 # Set page configuration
 st.set_page_config(
@@ -187,6 +193,24 @@ if 'tax_result' not in st.session_state:
 if 'insurance_score' not in st.session_state:
     st.session_state.insurance_score = 0
 
+# What-if surface for the credit modal; cached per axis pair and the values
+# of the factors held fixed, so moving an axis slider reuses the grid.
+# Each grid is up to ~80 KB, so the process-wide cache is capped.
+SURFACE_CACHE_ENTRIES = 64
+FACTOR_LABELS = {
+    "payment_history": "Payment history (%)",
+    "credit_utilization": "Credit utilization (%)",
+    "credit_history": "Credit history (years)",
+    "new_credit": "New credit accounts",
+    "credit_mix": "Credit types",
+}
+
+
+@st.cache_data(show_spinner=False, max_entries=SURFACE_CACHE_ENTRIES)
+def credit_surface(x_factor, y_factor, fixed):
+    return score_surface(x_factor, y_factor, dict(fixed))
+
+
 # Header section
 st.markdown("""
 <div class="main-header">
@@ -294,39 +318,32 @@ if st.session_state.get('show_credit_modal', False):
         st.write("Variety of credit types (credit cards, mortgage, auto loans, etc.)")
         credit_mix = st.slider("Number of different credit types", 0, 10, 3, key="cm_slider")
     
-    if st.button("Calculate Credit Score", key="calc_credit"):
-        # Calculate individual factor scores
-        payment_score = (payment_history / 100) * 35 * 10
-        utilization_score = (1 - min(credit_utilization, 100) / 100) * 30 * 10
-        history_score = (min(credit_history, 30) / 30) * 15 * 10
-        new_credit_score = (1 - min(new_credit, 10) / 10) * 10 * 10
-        mix_score = (min(credit_mix, 5) / 5) * 10 * 10
+    with st.expander("What-if Explorer"):
+        st.write("See how the score changes across two factors at once, with the others held at your slider values")
+        axis_col1, axis_col2 = st.columns(2)
+        x_factor = axis_col1.selectbox("Horizontal axis", CREDIT_FACTORS, index=1, format_func=FACTOR_LABELS.get, key="whatif_x")
+        y_factor = axis_col2.selectbox("Vertical axis", [f for f in CREDIT_FACTORS if f != x_factor], format_func=FACTOR_LABELS.get, key="whatif_y")
         
-        # Calculate total score (300-850 range)
-        total_score = 300 + payment_score + utilization_score + history_score + new_credit_score + mix_score
-        total_score = round(min(max(total_score, 300), 850))
+        current = dict(zip(CREDIT_FACTORS, [payment_history, credit_utilization, credit_history, new_credit, credit_mix]))
+        fixed = tuple((f, v) for f, v in current.items() if f not in (x_factor, y_factor))
+        xs, ys, scores = credit_surface(x_factor, y_factor, fixed)
+        
+        fig = px.imshow(scores, x=xs, y=ys, origin="lower", aspect="auto", zmin=CREDIT_MIN, zmax=CREDIT_MAX,
+                        color_continuous_scale="RdYlGn",
+                        labels={"x": FACTOR_LABELS[x_factor], "y": FACTOR_LABELS[y_factor], "color": "FinScore"})
+        fig.add_scatter(x=[current[x_factor]], y=[current[y_factor]], mode="markers", name="You",
+                        marker=dict(color="black", size=10, symbol="x"))
+        st.plotly_chart(fig, use_container_width=True)
+    
+    if st.button("Calculate Credit Score", key="calc_credit"):
+        # Calculate total score (300-850 range) with the shared FinScore formula
+        total_score = int(credit_score(payment_history, credit_utilization, credit_history, new_credit, credit_mix))
         
         # Determine rating
-        if total_score >= 800:
-            rating = "Excellent"
-            rating_color = "#27ae60"
-            result_class = "result-success"
-        elif total_score >= 740:
-            rating = "Very Good"
-            rating_color = "#2ecc71"
-            result_class = "result-success"
-        elif total_score >= 670:
-            rating = "Good"
-            rating_color = "#f39c12"
-            result_class = "result-warning"
-        elif total_score >= 580:
-            rating = "Fair"
-            rating_color = "#e67e22"
-            result_class = "result-warning"
-        else:
-            rating = "Poor"
-            rating_color = "#e74c3c"
-            result_class = "result-danger"
+        idx = rating_index(total_score)
+        rating = RATINGS[idx]
+        rating_color = RATING_COLORS[idx]
+        result_class = RATING_CLASSES[idx]
         
         # Display results
         st.markdown(f"""
@@ -357,54 +374,15 @@ if st.session_state.get('show_tax_modal', False):
     st.header("Tax Calculation")
     
     annual_income = st.number_input("Annual Gross Income ($)", min_value=0.0, value=50000.0, step=1000.0)
-    filing_status = st.selectbox("Filing Status", ["Single", "Married Filing Jointly", "Head of Household"])
+    filing_status = st.selectbox("Filing Status", list(TAX_SCHEDULES))
     deductions = st.number_input("Total Deductions ($)", min_value=0.0, value=12500.0, step=1000.0)
     
     if st.button("Calculate Tax", key="calc_tax"):
-        taxable_income = annual_income - deductions
-        
-        # Simplified tax brackets for demonstration
-        if filing_status == "Single":
-            if taxable_income <= 11000:
-                tax_bracket = '10%'
-                tax_amount = taxable_income * 0.1
-            elif taxable_income <= 44725:
-                tax_bracket = '12%'
-                tax_amount = 1100 + (taxable_income - 11000) * 0.12
-            elif taxable_income <= 95375:
-                tax_bracket = '22%'
-                tax_amount = 5147 + (taxable_income - 44725) * 0.22
-            else:
-                tax_bracket = '24%+'
-                tax_amount = 16290 + (taxable_income - 95375) * 0.24
-        elif filing_status == "Married Filing Jointly":
-            if taxable_income <= 22000:
-                tax_bracket = '10%'
-                tax_amount = taxable_income * 0.1
-            elif taxable_income <= 89450:
-                tax_bracket = '12%'
-                tax_amount = 2200 + (taxable_income - 22000) * 0.12
-            elif taxable_income <= 190750:
-                tax_bracket = '22%'
-                tax_amount = 10294 + (taxable_income - 89450) * 0.22
-            else:
-                tax_bracket = '24%+'
-                tax_amount = 32580 + (taxable_income - 190750) * 0.24
-        else:  # Head of Household
-            if taxable_income <= 15700:
-                tax_bracket = '10%'
-                tax_amount = taxable_income * 0.1
-            elif taxable_income <= 59850:
-                tax_bracket = '12%'
-                tax_amount = 1570 + (taxable_income - 15700) * 0.12
-            elif taxable_income <= 95350:
-                tax_bracket = '22%'
-                tax_amount = 6868 + (taxable_income - 59850) * 0.22
-            else:
-                tax_bracket = '24%+'
-                tax_amount = 14678 + (taxable_income - 95350) * 0.24
-        
-        net_income = annual_income - tax_amount
+        result = compute_tax(annual_income, deductions, filing_status)
+        taxable_income = float(result["taxable_income"])
+        tax_bracket = str(result["tax_bracket"])
+        tax_amount = float(result["tax_amount"])
+        net_income = float(result["net_income"])
         
         st.session_state.tax_result = {
             'gross_income': annual_income,
@@ -439,72 +417,18 @@ if st.session_state.get('show_insurance_modal', False):
     st.markdown("---")
     st.header("Insurance Coverage")
     
-    health_insurance = st.selectbox("Health Insurance Coverage", 
-                                   ["No Coverage", "Basic Coverage", "Comprehensive Coverage"])
-    auto_insurance = st.selectbox("Auto Insurance Coverage", 
-                                 ["No Coverage", "Liability Only", "Full Coverage"])
-    home_insurance = st.selectbox("Home Insurance Coverage", 
-                                 ["No Coverage", "Renters Insurance", "Homeowners Insurance"])
-    life_insurance = st.selectbox("Life Insurance Coverage", 
-                                 ["No Coverage", "Term Life", "Whole Life"])
+    health_insurance = st.selectbox("Health Insurance Coverage", INSURANCE_POLICIES["health"][0])
+    auto_insurance = st.selectbox("Auto Insurance Coverage", INSURANCE_POLICIES["auto"][0])
+    home_insurance = st.selectbox("Home Insurance Coverage", INSURANCE_POLICIES["home"][0])
+    life_insurance = st.selectbox("Life Insurance Coverage", INSURANCE_POLICIES["life"][0])
     
     if st.button("Evaluate Coverage", key="calc_insurance"):
-        coverage_score = 0
-        recommendations = []
+        codes = [INSURANCE_POLICIES[p][0].index(level) for p, level in
+                 zip(POLICY_TYPES, [health_insurance, auto_insurance, home_insurance, life_insurance])]
+        scores, masks = insurance_score(codes)
+        coverage_score = int(scores[0])
         
-        # Evaluate health insurance
-        if health_insurance == 'No Coverage':
-            recommendations.append('Consider getting health insurance to protect against medical costs')
-        elif health_insurance == 'Basic Coverage':
-            coverage_score += 25
-        else:
-            coverage_score += 35
-        
-        # Evaluate auto insurance
-        if auto_insurance == 'No Coverage':
-            recommendations.append('Auto insurance is legally required in most states')
-        elif auto_insurance == 'Liability Only':
-            coverage_score += 15
-        else:
-            coverage_score += 20
-        
-        # Evaluate home insurance
-        if home_insurance == 'No Coverage':
-            recommendations.append('Consider getting home/renters insurance to protect your property')
-        elif home_insurance == 'Renters Insurance':
-            coverage_score += 15
-        else:
-            coverage_score += 25
-        
-        # Evaluate life insurance
-        if life_insurance == 'No Coverage':
-            recommendations.append('Consider life insurance if you have dependents')
-        elif life_insurance == 'Term Life':
-            coverage_score += 15
-        else:
-            coverage_score += 20
-        
-        if coverage_score >= 70:
-            result_class = "result-success"
-        elif coverage_score >= 40:
-            result_class = "result-warning"
-        else:
-            result_class = "result-danger"
-        
-        recommendations_html = ''
-        if recommendations:
-            recommendations_html = '<h4>Recommendations:</h4><ul>'
-            for rec in recommendations:
-                recommendations_html += f'<li>{rec}</li>'
-            recommendations_html += '</ul>'
-        
-        st.markdown(f"""
-        <div class="result-container {result_class}">
-            <h3>Insurance Coverage Results</h3>
-            <p><strong>Coverage Score:</strong> {coverage_score}/100</p>
-            {recommendations_html}
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(render_insurance_result(coverage_score, masks[0]), unsafe_allow_html=True)
         
         # Mark as completed
         st.session_state.completed_assessments['insurance'] = True
@@ -521,20 +445,12 @@ st.markdown("---")
 st.header("Loan Eligibility Result")
 
 if st.button("Check Eligibility", key="check_eligibility", disabled=completed_count < 3):
-    credit_score = st.session_state.credit_score
+    applicant_score = st.session_state.credit_score
     annual_income = st.session_state.tax_result.get('gross_income', 0) if st.session_state.tax_result else 0
     
-    eligible = True
-    reasons = []
-    
-    if credit_score < 580:
-        eligible = False
-        reasons.append('Credit score is too low (below 580)')
-    elif credit_score < 670:
-        reasons.append('Credit score is fair, which may result in higher interest rates')
-    
-    if annual_income < 30000:
-        reasons.append('Income is relatively low, which may limit loan amount')
+    eligible, reason_code = loan_eligibility(applicant_score, annual_income, st.session_state.insurance_score)
+    eligible = bool(eligible)
+    reasons = reason_list(reason_code)
     
     if eligible:
         st.markdown(f"""
@@ -557,6 +473,86 @@ if st.button("Check Eligibility", key="check_eligibility", disabled=completed_co
         </div>
         """, unsafe_allow_html=True)
 
+# Batch credit scoring
+st.markdown("---")
+st.header("Batch Credit Scoring")
+st.write("Upload an applicant CSV with columns payment_history, credit_utilization, credit_history, new_credit and credit_mix (optional applicant_id) to score every row at once.")
+
+applicants_file = st.file_uploader("Applicant file (CSV)", type=["csv"], key="credit_batch_file")
+if applicants_file is not None and st.button("Score Applicants", key="score_batch"):
+    try:
+        scored, invalid = score_applicants(read_applicants(applicants_file))
+    except ValueError as e:
+        st.error(f"Could not score file: {e}")
+    else:
+        st.write(f"Scored {len(scored):,} applicants")
+        if len(invalid):
+            st.warning(f"{len(invalid):,} rows could not be scored")
+            st.dataframe(invalid.head(100))
+        st.dataframe(scored["rating"].value_counts().reindex(RATINGS, fill_value=0).rename("applicants"))
+        st.dataframe(scored.head(100))
+        st.download_button("Download scores (CSV)", data=scored.to_csv(index=False).encode("utf-8"),
+                           file_name="finscore_results.csv", mime="text/csv")
+
+# Batch tax calculation
+st.markdown("---")
+st.header("Batch Tax Calculation")
+st.write("Upload a payroll CSV with a gross_income column (optional deductions, filing_status and employee_id) to compute tax for every row at once.")
+
+payroll_file = st.file_uploader("Payroll file (CSV)", type=["csv"], key="tax_batch_file")
+payroll_deductions = st.number_input("Default Deductions ($)", min_value=0.0, value=12500.0, step=1000.0, key="payroll_deductions")
+if payroll_file is not None and st.button("Calculate Payroll Tax", key="tax_batch"):
+    try:
+        payroll = tax_payroll(pd.read_csv(payroll_file), default_deductions=payroll_deductions)
+    except ValueError as e:
+        st.error(f"Could not process file: {e}")
+    else:
+        st.write(f"Computed tax for {len(payroll):,} rows, total ${payroll['tax_amount'].sum():,.2f}")
+        st.dataframe(payroll.groupby(["filing_status", "tax_bracket"] if "filing_status" in payroll.columns else "tax_bracket")["tax_amount"].agg(["count", "sum"]))
+        st.dataframe(payroll.head(100))
+        st.download_button("Download payroll tax (CSV)", data=payroll.to_csv(index=False).encode("utf-8"),
+                           file_name="payroll_tax.csv", mime="text/csv")
+
+# Batch insurance scoring
+st.markdown("---")
+st.header("Batch Insurance Scoring")
+st.write(f"Upload a policy CSV with columns {', '.join(POLICY_TYPES)} holding the coverage levels shown in the Insurance Coverage form (optional applicant_id) to score every row at once.")
+
+policies_file = st.file_uploader("Policy file (CSV)", type=["csv"], key="insurance_batch_file")
+if policies_file is not None and st.button("Score Policies", key="insurance_batch"):
+    try:
+        policies = score_policies(pd.read_csv(policies_file, dtype=str))
+    except ValueError as e:
+        st.error(f"Could not score file: {e}")
+    else:
+        policies["coverage_class"] = coverage_class(policies["insurance_score"].to_numpy())
+        st.write(f"Scored {len(policies):,} policies, average coverage {policies['insurance_score'].mean():.1f}/100")
+        st.dataframe(policies["coverage_class"].value_counts().reindex(COVERAGE_CLASSES[::-1], fill_value=0).rename("policies"))
+        st.dataframe(policies.head(100))
+        st.download_button("Download coverage scores (CSV)", data=policies.to_csv(index=False).encode("utf-8"),
+                           file_name="insurance_scores.csv", mime="text/csv")
+
+# Batch loan eligibility
+st.markdown("---")
+st.header("Batch Loan Eligibility")
+st.write("Upload an applicant CSV with gross_income plus either credit_score or the five credit factor columns (optional deductions, filing_status, applicant_id and insurance_score or the coverage columns) to run the full assessment for every row.")
+
+eligibility_file = st.file_uploader("Applicant file (CSV)", type=["csv"], key="eligibility_batch_file")
+eligibility_deductions = st.number_input("Default Deductions ($)", min_value=0.0, value=12500.0, step=1000.0, key="eligibility_deductions")
+if eligibility_file is not None and st.button("Run Eligibility", key="eligibility_batch"):
+    try:
+        decisions = assess_applicants(pd.read_csv(eligibility_file), default_deductions=eligibility_deductions)
+    except ValueError as e:
+        st.error(f"Could not process file: {e}")
+    else:
+        approved = int(decisions["eligible"].sum())
+        st.write(f"Approved {approved:,} of {len(decisions):,} applicants")
+        st.dataframe(decisions.groupby(["decision", "reason_code"]).size().rename("applicants").reset_index()
+                     .assign(reasons=lambda d: REASON_TEXT[d["reason_code"].to_numpy()]))
+        st.dataframe(decisions.head(100))
+        st.download_button("Download decisions (CSV)", data=decisions.to_csv(index=False).encode("utf-8"),
+                           file_name="loan_decisions.csv", mime="text/csv")
+
 # Footer
 st.markdown("""
 <footer>
@@ -0,0 +1,194 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+# -----------------------
+# Bulk statement import
+# -----------------------
+# Reads bank statement CSV or OFX files, validates and normalizes them with
+# vectorized pandas operations and returns transactions in the ledger's
+# {"type", "amount", "category", "date", "notes"} layout, ready to be
+# committed in one batch write.
+
+DEFAULT_CATEGORY = "Imported"
+
+# Header aliases seen in common bank CSV exports (compared lower-cased)
+DATE_COLUMNS = ["date", "transaction date", "txn date", "posting date", "value date"]
+AMOUNT_COLUMNS = ["amount", "transaction amount", "amt"]
+DEBIT_COLUMNS = ["debit", "withdrawal", "withdrawal amt.", "withdrawals", "dr"]
+CREDIT_COLUMNS = ["credit", "deposit", "deposit amt.", "deposits", "cr"]
+NOTES_COLUMNS = ["notes", "description", "narration", "details", "memo", "particulars"]
+CATEGORY_COLUMNS = ["category"]
+TYPE_COLUMNS = ["type"]
+
+# Bank "Type" values (compared lower-cased) -> ledger type
+TYPE_ALIASES = {
+    "income": "Income", "credit": "Income", "cr": "Income", "deposit": "Income",
+    "expense": "Expense", "debit": "Expense", "dr": "Expense", "withdrawal": "Expense",
+}
+
+# Currency markers removed before any other character, so the "." of
+# "Rs." is not read as a decimal point
+CURRENCY_PATTERN = r"(?i)\b(?:rs|inr|usd)\b\.?|[₹$€£]"
+
+
+def _pick(df, aliases):
+    cols = {c.strip().lower(): c for c in df.columns}
+    for a in aliases:
+        if a in cols:
+            return cols[a]
+    return None
+
+
+def _to_number(series):
+    # Strip currency markers, then thousands separators and other noise;
+    # accounting negatives like "(1,200.00)" keep their sign
+    text = series.astype(str).str.strip()
+    negative = text.str.match(r"^\(.*\)$")
+    cleaned = text.str.replace(CURRENCY_PATTERN, "", regex=True).str.replace(r"[^0-9.\-]", "", regex=True)
+    numbers = pd.to_numeric(cleaned, errors="coerce")
+    return numbers.where(~negative, -numbers.abs())
+
+
+def _blank(series):
+    return series.isna() | (series.astype(str).str.strip() == "")
+
+
+def _to_date(series):
+    # ISO dates first, then day-first formats common on Indian bank statements
+    dates = pd.to_datetime(series, errors="coerce", format="ISO8601")
+    missing = dates.isna() & series.notna()
+    if missing.any():
+        dates[missing] = pd.to_datetime(series[missing], errors="coerce", dayfirst=True, format="mixed")
+    return dates
+
+
+def _normalize(dates, amounts, types, categories, notes):
+    """Build the ledger frame and split out rows that failed validation."""
+    df = pd.DataFrame({
+        "type": types,
+        "amount": amounts.abs().astype("float64"),
+        "category": categories.fillna(DEFAULT_CATEGORY).astype(str).str.strip().replace("", DEFAULT_CATEGORY),
+        "date": dates,
+        "notes": notes.fillna("").astype(str).str.strip(),
+    })
+    valid = df["date"].notna() & df["amount"].notna() & df["type"].isin(["Income", "Expense"])
+    good = df[valid].copy()
+    good["date"] = good["date"].dt.strftime("%Y-%m-%d")
+    return good, df[~valid]
+
+
+def parse_csv_statement(data):
+    df = pd.read_csv(io.BytesIO(data) if isinstance(data, bytes) else data, dtype=str)
+    n = len(df)
+    empty = pd.Series([None] * n, index=df.index, dtype=object)
+
+    date_col = _pick(df, DATE_COLUMNS)
+    if date_col is None:
+        raise ValueError("Statement has no date column")
+    dates = _to_date(df[date_col])
+
+    amount_col = _pick(df, AMOUNT_COLUMNS)
+    debit_col, credit_col = _pick(df, DEBIT_COLUMNS), _pick(df, CREDIT_COLUMNS)
+    if amount_col is not None:
+        amounts = _to_number(df[amount_col])
+    elif debit_col is not None or credit_col is not None:
+        nan = pd.Series(np.nan, index=df.index)
+        debit = _to_number(df[debit_col]) if debit_col else nan
+        credit = _to_number(df[credit_col]) if credit_col else nan
+        # Rows with nothing on either side ("Opening balance") or a cell that
+        # does not parse get a NaN amount, which _normalize rejects
+        unparsed = pd.Series(False, index=df.index)
+        for col, values in ((debit_col, debit), (credit_col, credit)):
+            if col:
+                unparsed |= values.isna() & ~_blank(df[col])
+        amounts = credit.fillna(0) - debit.fillna(0)
+        amounts[unparsed | (debit.isna() & credit.isna())] = np.nan
+    else:
+        raise ValueError("Statement has no amount or debit/credit columns")
+
+    # Unrecognised or missing bank types fall back to the sign of the amount
+    types = pd.Series(np.where(amounts > 0, "Income", "Expense"), index=df.index)
+    type_col = _pick(df, TYPE_COLUMNS)
+    if type_col is not None:
+        types = df[type_col].str.strip().str.lower().map(TYPE_ALIASES).fillna(types)
+
+    cat_col, notes_col = _pick(df, CATEGORY_COLUMNS), _pick(df, NOTES_COLUMNS)
+    return _normalize(
+        dates,
+        amounts,
+        types,
+        df[cat_col] if cat_col else empty,
+        df[notes_col] if notes_col else empty,
+    )
+
+
+def parse_ofx_statement(data):
+    text = data.decode("utf-8", errors="ignore") if isinstance(data, bytes) else data
+    # One row per <STMTTRN> block, fields pulled out with vectorized regexes
+    blocks = pd.Series(text.split("<STMTTRN>")[1:], dtype=object)
+    if blocks.empty:
+        raise ValueError("No <STMTTRN> records found")
+
+    def field(tag):
+        return blocks.str.extract(rf"<{tag}>\s*([^<\r\n]*)", expand=False).str.strip()
+
+    dates = pd.to_datetime(field("DTPOSTED").str[:8], format="%Y%m%d", errors="coerce")
+    amounts = _to_number(field("TRNAMT"))
+    types = pd.Series(np.where(amounts > 0, "Income", "Expense"), index=blocks.index)
+    notes = field("NAME").fillna("").str.cat(field("MEMO").fillna(""), sep=" ")
+    return _normalize(dates, amounts, types, pd.Series([None] * len(blocks), dtype=object), notes)
+
+
+def parse_statement(data, filename):
+    """Return (valid transactions DataFrame, rejected rows DataFrame)."""
+    if filename.lower().endswith((".ofx", ".qfx")):
+        return parse_ofx_statement(data)
+    return parse_csv_statement(data)
+
+
+# -----------------------
+# Portfolio parsing
+# -----------------------
+# name,quantity,price lines parsed in one read_csv pass; numbers are coerced
+# column-wise and rows that fail come back as a side table.
+
+PORTFOLIO_COLUMNS = ["name", "qty", "price"]
+
+
+def parse_portfolio(data):
+    """Return (valid holdings with a value column, invalid rows with a reason)."""
+    if isinstance(data, bytes):
+        data = data.decode("utf-8", errors="ignore")
+    df = pd.read_csv(
+        io.StringIO(data),
+        header=None,
+        names=PORTFOLIO_COLUMNS,
+        usecols=[0, 1, 2],
+        index_col=False,
+        skipinitialspace=True,
+        skip_blank_lines=True,
+        dtype=str,
+    )
+    df.index = df.index + 1  # 1-based row numbers for the invalid table
+
+    # Drop a "name,quantity,price" style header row
+    if len(df) and str(df["qty"].iloc[0]).strip().lower() in ("qty", "quantity"):
+        df = df.iloc[1:]
+
+    name = df["name"].str.strip()
+    qty = pd.to_numeric(df["qty"], errors="coerce")
+    price = pd.to_numeric(df["price"], errors="coerce")
+
+    reason = pd.Series("", index=df.index, dtype=object)
+    reason[price.isna()] = "invalid price"
+    reason[qty.isna()] = "invalid quantity"
+    reason[df["price"].isna()] = "expected name,quantity,price"
+    reason[name.isna() | (name == "")] = "missing name"
+    bad = reason != ""
+
+    valid = pd.DataFrame({"name": name, "qty": qty, "price": price})[~bad].reset_index(drop=True)
+    valid["value"] = valid.qty * valid.price
+    invalid = df[bad].assign(reason=reason[bad])
+    return valid, invalid
@@ -0,0 +1,896 @@
+import bisect
+import csv
+import html
+import io
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to unlocked writes
+    fcntl = None
+
+# -----------------------
+# Safe file writes
+# -----------------------
+# Every data file is written under an advisory lock on "<file>.lock", via a
+# temp file that is fsynced and renamed over the original, so a crash never
+# leaves a half-written file and concurrent sessions never interleave. Each
+# write bumps a counter in "<file>.version" so a session can tell that
+# another one changed the file since it last read it.
+
+
+def _fsync_write(f, text):
+    f.write(text)
+    f.flush()
+    os.fsync(f.fileno())
+
+
+@contextmanager
+def file_lock(path):
+    with open(path + ".lock", "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def file_version(path):
+    try:
+        with open(path + ".version", "r") as f:
+            return int(f.read() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def _bump_version(path):
+    # Caller holds the file lock
+    version = file_version(path) + 1
+    atomic_write_text(path + ".version", str(version))
+    return version
+
+
+def atomic_write_text(path, text):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            _fsync_write(f, text)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def load_json(path, default):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception:
+        return default
+
+
+def save_json(path, data):
+    """Atomically replace path under its lock; returns the new version."""
+    with file_lock(path):
+        atomic_write_text(path, json.dumps(data, indent=2))
+        return _bump_version(path)
+
+
+def update_json(path, default, fn):
+    """Read-modify-write path under its lock so concurrent updates merge.
+
+    Returns (new data, new version).
+    """
+    with file_lock(path):
+        data = fn(load_json(path, default))
+        atomic_write_text(path, json.dumps(data, indent=2))
+        return data, _bump_version(path)
+
+# -----------------------
+# Per-user partitions
+# -----------------------
+# Each user gets their own directory holding their log, links, rollup,
+# budgets and database, so a session only ever loads its own user's data.
+
+PARTITION_FILES = [
+    "links.json", "transactions.json", "transactions.jsonl", "rollup.json", "budgets.json", "finance.db",
+]
+
+
+# Characters kept as-is in partition names; everything else (including
+# upper case, for case-insensitive filesystems) is percent-encoded
+PARTITION_SAFE_CHARS = "abcdefghijklmnopqrstuvwxyz0123456789_.@-"
+MAX_USER_ID_LENGTH = 64
+
+
+def partition_name(user_id):
+    """Reversible directory name for user_id, so distinct IDs never share a partition."""
+    if not user_id or len(user_id) > MAX_USER_ID_LENGTH:
+        raise ValueError(f"User ID must be 1-{MAX_USER_ID_LENGTH} characters")
+    name = "".join(
+        c if c in PARTITION_SAFE_CHARS else "".join(f"%{b:02X}" for b in c.encode("utf-8")) for c in user_id
+    )
+    # No ".", ".." or hidden directories
+    return "%2E" + name[1:] if name.startswith(".") else name
+
+
+def partition_dir(root, user_id):
+    """Directory for user_id under root, created on first use."""
+    path = os.path.join(root, partition_name(user_id))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def adopt_shared_files(src_dir, dest_dir):
+    """Move pre-partition data files from src_dir into an empty partition."""
+    if any(os.path.exists(os.path.join(dest_dir, name)) for name in PARTITION_FILES):
+        return
+    for name in PARTITION_FILES:
+        for suffix in ("", ".lock", ".version", "-wal", "-shm"):
+            src = os.path.join(src_dir, name + suffix)
+            if os.path.exists(src):
+                os.replace(src, os.path.join(dest_dir, name + suffix))
+
+
+# -----------------------
+# Transaction storage
+# -----------------------
+# Transactions are kept in an append-only JSON Lines log instead of being
+# rewritten as one JSON document on every insert. Each line is an operation:
+#
+#   {"op": "add", "txn": {...}}
+#   {"op": "clear"}
+#
+# Adding a transaction appends one line and fsyncs, so its cost does not
+# grow with the ledger. Records made dead by a clear (and any torn last line
+# left by a crash) are dropped by compaction, which rewrites the live rows to
+# a temp file and renames it over the log. Appends and compaction both hold
+# the log's file lock, and compaction replays the file itself so it never
+# drops rows appended by another session.
+
+COMPACT_MIN_DEAD = 1000
+
+
+class TransactionLog:
+    def __init__(self, path, compact_min_dead=COMPACT_MIN_DEAD):
+        self.path = path
+        self.compact_min_dead = compact_min_dead
+
+    def _replay(self):
+        txns = []
+        dead = 0
+        torn = False
+        try:
+            with open(self.path, "r") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        # Torn write from a crash; compaction drops it
+                        torn = True
+                        continue
+                    if rec.get("op") == "add":
+                        txns.append(rec["txn"])
+                    elif rec.get("op") == "clear":
+                        dead += len(txns) + 1
+                        txns = []
+        except FileNotFoundError:
+            pass
+        return txns, dead, torn
+
+    def load(self):
+        """Replay the log and return the live transactions."""
+        txns, dead, torn = self._replay()
+        # Periodic compaction once dead records are worth a rewrite; a torn
+        # tail is always repaired so the next append starts on a fresh line
+        if torn or (dead and dead >= max(self.compact_min_dead, len(txns))):
+            txns = self.compact()
+        return txns
+
+    def version(self):
+        return file_version(self.path)
+
+    def _append_text(self, text):
+        with file_lock(self.path):
+            with open(self.path, "a") as f:
+                _fsync_write(f, text)
+            return _bump_version(self.path)
+
+    def append(self, txn):
+        return self.extend([txn])
+
+    def extend(self, txns):
+        """Append many transactions with a single write and fsync; returns the new version."""
+        if not txns:
+            return self.version()
+        return self._append_text("".join(json.dumps({"op": "add", "txn": t}) + "\n" for t in txns))
+
+    def clear(self):
+        return self._append_text(json.dumps({"op": "clear"}) + "\n")
+
+    def _rewrite(self, txns):
+        atomic_write_text(self.path, "".join(json.dumps({"op": "add", "txn": t}) + "\n" for t in txns))
+        _bump_version(self.path)
+
+    def compact(self):
+        """Rewrite the log with only its live rows; returns them."""
+        with file_lock(self.path):
+            txns, _, _ = self._replay()
+            self._rewrite(txns)
+        return txns
+
+    def migrate_from(self, legacy_path):
+        """One-off import of a legacy transactions.json into an empty log."""
+        with file_lock(self.path):
+            if os.path.exists(self.path) or not os.path.exists(legacy_path):
+                return
+            try:
+                with open(legacy_path, "r") as f:
+                    txns = json.load(f)
+            except Exception:
+                return
+            self._rewrite(txns)
+            os.replace(legacy_path, legacy_path + ".migrated")
+
+
+# -----------------------
+# Ledger backends
+# -----------------------
+# The menu pages talk to a ledger object instead of raw lists. JsonLedger
+# keeps everything in memory and persists through the TransactionLog and
+# links.json; SQLiteLedger keeps rows on disk and pushes filtering, sorting
+# and grouping into indexed SQL so memory stays flat as the ledger grows.
+
+TXN_COLUMNS = ["type", "amount", "category", "date", "notes"]
+
+# One screen of transactions, newest first. first/last are opaque cursors to
+# pass back as before=/after= to fetch the neighbouring page.
+TransactionPage = namedtuple("TransactionPage", ["rows", "first", "last", "has_prev", "has_next"])
+
+
+ROLLUP_COLUMNS = ["month", "type", "category", "amount", "count"]
+
+
+def monthly_from_rollup(rollup):
+    """Income/expense per month from a rollup frame (tens of rows, not the ledger)."""
+    df = rollup.groupby(["month", "type"], as_index=False).amount.sum()
+    df = df.rename(columns={"month": "date"})
+    df["date"] = pd.to_datetime(df["date"], format="%Y-%m")
+    return df.sort_values(["date", "type"]).reset_index(drop=True)
+
+
+class CategoryTree:
+    """type -> category tree over the rollup with per-node sums and counts.
+
+    Each leaf keeps prefix sums over the sorted monthly buckets, so the
+    totals for any month range are two lookups per leaf instead of a rescan
+    of the raw transactions.
+    """
+
+    def __init__(self, rollup):
+        self.months = sorted(rollup["month"].unique())
+        leaves = rollup.groupby(["type", "category"], sort=True)
+        self.leaves = pd.DataFrame(list(leaves.groups), columns=["type", "category"])
+
+        month_pos = {m: i for i, m in enumerate(self.months)}
+        leaf_pos = {key: i for i, key in enumerate(leaves.groups)}
+        amounts = np.zeros((len(self.leaves), len(self.months) + 1))
+        counts = np.zeros((len(self.leaves), len(self.months) + 1), dtype=np.int64)
+        rows = [leaf_pos[k] for k in zip(rollup["type"], rollup["category"])]
+        cols = [month_pos[m] + 1 for m in rollup["month"]]
+        np.add.at(amounts, (rows, cols), rollup["amount"].to_numpy())
+        np.add.at(counts, (rows, cols), rollup["count"].to_numpy())
+        self._cum_amount = np.cumsum(amounts, axis=1)
+        self._cum_count = np.cumsum(counts, axis=1)
+
+    def query(self, start_month=None, end_month=None):
+        """Leaf rows (type, category, amount, count) for months in [start, end]."""
+        lo = 0 if start_month is None else np.searchsorted(self.months, start_month, side="left")
+        hi = len(self.months) if end_month is None else np.searchsorted(self.months, end_month, side="right")
+        df = self.leaves.assign(
+            amount=self._cum_amount[:, hi] - self._cum_amount[:, lo],
+            count=self._cum_count[:, hi] - self._cum_count[:, lo],
+        )
+        return df[df["count"] > 0].reset_index(drop=True)
+
+    def type_totals(self, start_month=None, end_month=None):
+        return self.query(start_month, end_month).groupby("type", as_index=False)[["amount", "count"]].sum()
+
+
+class LedgerAggregates:
+    """Running totals kept up to date as transactions are added.
+
+    Every update is O(1), so dashboard KPIs never rescan the ledger. The
+    monthly rollup keyed by (month, type, category) is persisted next to the
+    ledger so charts can start from it without replaying history. It is
+    saved with the log version it reflects and only reused while the log is
+    still at that version.
+    """
+
+    def __init__(self, txns=()):
+        self.reset()
+        for t in txns:
+            self.add(t)
+
+    def reset(self):
+        self.count = 0
+        self.balance = 0.0
+        self.by_type = defaultdict(float)
+        self.rollup = {}  # (month "YYYY-MM", type, category) -> [amount, count]
+
+    def add(self, txn):
+        amount = txn["amount"]
+        self.count += 1
+        self.balance += amount
+        self.by_type[txn["type"]] += amount
+        cell = self.rollup.setdefault((txn["date"][:7], txn["type"], txn["category"]), [0.0, 0])
+        cell[0] += amount
+        cell[1] += 1
+
+    def totals(self):
+        return self.balance, self.by_type.get("Income", 0.0), self.by_type.get("Expense", 0.0)
+
+    def rollup_frame(self):
+        return pd.DataFrame(
+            [(m, t, c, v, n) for (m, t, c), (v, n) in self.rollup.items()], columns=ROLLUP_COLUMNS
+        )
+
+    def save(self, path, log_version):
+        save_json(path, {
+            "log_version": log_version,
+            "count": self.count,
+            "balance": self.balance,
+            "by_type": self.by_type,
+            "rollup": [[m, t, c, v, n] for (m, t, c), (v, n) in self.rollup.items()],
+        })
+
+    @classmethod
+    def load(cls, path, txns, log_version):
+        """Load the persisted aggregates, rebuilding them if the log has moved on."""
+        data = load_json(path, None)
+        if data is not None and data.get("log_version") == log_version and data.get("count") == len(txns):
+            agg = cls()
+            agg.count = data["count"]
+            agg.balance = data["balance"]
+            agg.by_type.update(data["by_type"])
+            agg.rollup = {(m, t, c): [v, n] for m, t, c, v, n in data["rollup"]}
+            return agg
+        agg = cls(txns)
+        agg.save(path, log_version)
+        return agg
+
+
+BUDGET_WARN_AT = 0.8
+
+
+def budget_status(budgets, spent, warn_at=BUDGET_WARN_AT):
+    """Budget vs actual per category, with utilization and an alert status."""
+    df = pd.DataFrame({"category": list(budgets), "budget": [float(v) for v in budgets.values()]})
+    df["spent"] = [float(spent.get(c, 0.0)) for c in df["category"]]
+    df["remaining"] = df["budget"] - df["spent"]
+    df["utilization"] = np.where(df["budget"] > 0, df["spent"] / df["budget"].where(df["budget"] > 0), np.nan)
+    df["status"] = np.select(
+        [df["budget"] <= 0, df["spent"] > df["budget"], df["utilization"] >= warn_at],
+        ["No budget", "Over budget", "Near limit"],
+        default="OK",
+    )
+    return df
+
+
+class LinkIndex:
+    """Inverted index over link tags and name/URL tokens.
+
+    Tokens are kept sorted so a prefix query is a bisect plus a short scan,
+    and matches render as one HTML block instead of one element per link.
+    """
+
+    def __init__(self, links):
+        self.links = links
+        self.by_tag = defaultdict(list)
+        postings = defaultdict(set)
+        for i, l in enumerate(links):
+            self.by_tag[l.get("tag", "Other")].append(i)
+            for tok in re.split(r"[^0-9a-z]+", f"{l.get('name', '')} {l.get('url', '')}".lower()):
+                if tok:
+                    postings[tok].add(i)
+        self.tokens = sorted(postings)
+        self.postings = postings
+
+    def tags(self):
+        return sorted(self.by_tag)
+
+    def _prefix(self, prefix):
+        ids = set()
+        pos = bisect.bisect_left(self.tokens, prefix)
+        while pos < len(self.tokens) and self.tokens[pos].startswith(prefix):
+            ids |= self.postings[self.tokens[pos]]
+            pos += 1
+        return ids
+
+    def search(self, query="", tag=None):
+        """Positions of links matching every query term (as a prefix) and tag."""
+        ids = None if tag is None else set(self.by_tag.get(tag, ()))
+        for term in re.split(r"[^0-9a-z]+", query.lower()):
+            if term:
+                hits = self._prefix(term)
+                ids = hits if ids is None else ids & hits
+        return list(range(len(self.links))) if ids is None else sorted(ids)
+
+    def render(self, ids):
+        parts = []
+        for i in ids:
+            l = self.links[i]
+            name, url, tag = (html.escape(str(l.get(k, ""))) for k in ("name", "url", "tag"))
+            parts.append(
+                f"<div class='link-card'><strong>{name}</strong> <span class='muted'>({tag})</span>"
+                f"<br/><a href='{url}' target='_blank'>{url}</a></div>"
+            )
+        return "".join(parts)
+
+
+class JsonLedger:
+    def __init__(self, txn_log, links_path, rollup_path, budgets_path):
+        self.txn_log = txn_log
+        self.links_path = links_path
+        self.rollup_path = rollup_path
+        self.budgets_path = budgets_path
+        self.version = 0  # bumped on every change; invalidates the cached frame
+        self._frame_cache = None
+        self._order_cache = None
+        self._tree_cache = None
+        self._link_index = None
+        self._load()
+
+    def _load(self):
+        # Versions are read first: a write racing the load just triggers another reload
+        self._log_version = self.txn_log.version()
+        self._links_version = file_version(self.links_path)
+        self._txns = self.txn_log.load()
+        self._links = load_json(self.links_path, [])
+        self.aggregates = LedgerAggregates.load(self.rollup_path, self._txns, self._log_version)
+        self._changed()
+
+    def refresh(self):
+        """Reload if another session wrote the log or links since we read them."""
+        if self.txn_log.version() != self._log_version or file_version(self.links_path) != self._links_version:
+            self._load()
+
+    def _logged(self, version):
+        # Only advance if no other session wrote in between; otherwise refresh() reloads
+        if version == self._log_version + 1:
+            self._log_version = version
+
+    def _save_aggregates(self):
+        # If another session wrote since our last sync, _log_version lags the
+        # log and the next load rebuilds instead of trusting these totals
+        self.aggregates.save(self.rollup_path, self._log_version)
+
+    def _changed(self):
+        self.version += 1
+        self._frame_cache = None
+        self._order_cache = None
+
+    def frame(self):
+        """Typed, columnar view of the ledger, rebuilt only after a change."""
+        if self._frame_cache is None:
+            df = pd.DataFrame(self._txns, columns=TXN_COLUMNS)
+            self._frame_cache = pd.DataFrame({
+                "type": df["type"].astype("category"),
+                "amount": df["amount"].astype("float64"),
+                "category": df["category"].astype("category"),
+                "date": pd.to_datetime(df["date"]),
+                "notes": df["notes"].fillna(""),
+            })
+        return self._frame_cache
+
+    # transactions
+    def count(self):
+        return len(self._txns)
+
+    def iter_transactions(self, chunk_rows):
+        for start in range(0, len(self._txns), chunk_rows):
+            yield self._txns[start:start + chunk_rows]
+
+    def add(self, txn):
+        self._txns.append(txn)
+        self._logged(self.txn_log.append(txn))
+        self.aggregates.add(txn)
+        self._save_aggregates()
+        self._changed()
+
+    def extend(self, txns):
+        self._txns.extend(txns)
+        self._logged(self.txn_log.extend(txns))
+        for t in txns:
+            self.aggregates.add(t)
+        self._save_aggregates()
+        self._changed()
+
+    def totals(self):
+        """Return (balance, income, expense)."""
+        return self.aggregates.totals()
+
+    def _newest_first(self):
+        # Positions sorted by date desc (later inserts first on ties), once per version
+        if self._order_cache is None:
+            dates = self.frame()["date"].to_numpy()
+            self._order_cache = np.argsort(dates, kind="stable")[::-1]
+        return self._order_cache
+
+    def _rows_at(self, positions):
+        df = self.frame().take(positions).reset_index(drop=True)
+        df["date"] = df["date"].dt.date
+        return df
+
+    def page(self, after=None, before=None, size=50):
+        """Return a TransactionPage; cursors are positions in newest-first order."""
+        order = self._newest_first()
+        if before is not None:
+            end = before
+            start = max(0, end - size)
+        else:
+            start = 0 if after is None else after + 1
+            end = min(len(order), start + size)
+        return TransactionPage(
+            self._rows_at(order[start:end]), start, end - 1, start > 0, end < len(order)
+        )
+
+    def monthly_summary(self):
+        return monthly_from_rollup(self.aggregates.rollup_frame())
+
+    def category_tree(self):
+        if self._tree_cache is None or self._tree_cache[0] != self.version:
+            self._tree_cache = (self.version, CategoryTree(self.aggregates.rollup_frame()))
+        return self._tree_cache[1]
+
+    # budgets
+    def budgets(self):
+        return load_json(self.budgets_path, {})
+
+    def set_budgets(self, budgets):
+        update_json(self.budgets_path, {}, lambda saved: {**saved, **budgets})
+
+    def spent(self, month, categories):
+        """Expense per category for a "YYYY-MM" month, read from the rollup counters."""
+        rollup = self.aggregates.rollup
+        return {c: rollup.get((month, "Expense", c), (0.0, 0))[0] for c in categories}
+
+    # links
+    def links(self):
+        return self._links
+
+    def link_index(self):
+        # _links is replaced, never mutated, whenever the links change
+        if self._link_index is None or self._link_index.links is not self._links:
+            self._link_index = LinkIndex(self._links)
+        return self._link_index
+
+    def add_link(self, entry):
+        # Merge with links other sessions saved instead of overwriting them
+        self._links, version = update_json(self.links_path, [], lambda links: links + [entry])
+        if version == self._links_version + 1:
+            self._links_version = version
+
+    def save(self):
+        # Everything is already on disk; compact the log and resync with it
+        self.txn_log.compact()
+        self._load()
+
+    def clear(self):
+        self._logged(self.txn_log.clear())
+        self._links, version = update_json(self.links_path, [], lambda links: [])
+        if version == self._links_version + 1:
+            self._links_version = version
+        self._txns = []
+        self.aggregates.reset()
+        self._save_aggregates()
+        self._changed()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    amount REAL NOT NULL,
+    category TEXT,
+    date TEXT NOT NULL,
+    notes TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_txn_date ON transactions(date);
+CREATE INDEX IF NOT EXISTS idx_txn_type ON transactions(type);
+CREATE INDEX IF NOT EXISTS idx_txn_category ON transactions(category);
+CREATE TABLE IF NOT EXISTS links (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    url TEXT NOT NULL,
+    tag TEXT,
+    created TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_links_tag ON links(tag);
+CREATE TABLE IF NOT EXISTS budgets (
+    category TEXT PRIMARY KEY,
+    amount REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS monthly_rollup (
+    month TEXT NOT NULL,
+    type TEXT NOT NULL,
+    category TEXT NOT NULL,
+    amount REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (month, type, category)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+"""
+
+BUMP_VERSION = "UPDATE meta SET value = value + 1 WHERE key = 'version'"
+
+ROLLUP_UPSERT = """
+INSERT INTO monthly_rollup (month, type, category, amount, count) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (month, type, category)
+DO UPDATE SET amount = amount + excluded.amount, count = count + excluded.count
+"""
+
+
+class SQLiteLedger:
+    def __init__(self, path):
+        self.path = path
+        # Streamlit reruns a session on different threads; guard the shared connection
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._tree_cache = None
+        self._link_index = None
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            # Databases created before the rollup existed are backfilled once
+            if not self._conn.execute("SELECT 1 FROM monthly_rollup LIMIT 1").fetchone():
+                self._conn.execute(
+                    "INSERT INTO monthly_rollup (month, type, category, amount, count) "
+                    "SELECT substr(date, 1, 7), type, COALESCE(category, ''), SUM(amount), COUNT(*) "
+                    "FROM transactions GROUP BY 1, 2, 3"
+                )
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def _scalar(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def migrate_from(self, txn_log, links_path):
+        """Seed an empty database from the JSON Lines log and links.json, once.
+
+        A "seeded" row in meta records that this ran (or that the database
+        already had data), so clear() does not bring the JSON data back.
+        """
+        if self._scalar("SELECT COUNT(*) FROM meta WHERE key = 'seeded'"):
+            return
+        if not (self.count() or self._scalar("SELECT COUNT(*) FROM links")):
+            self.extend(txn_log.load())
+            for entry in load_json(links_path, []):
+                self.add_link(entry)
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('seeded', 1)")
+
+    @property
+    def version(self):
+        """Bumped by every write, from any session."""
+        return self._scalar("SELECT value FROM meta WHERE key = 'version'")
+
+    # transactions
+    def count(self):
+        # Summed from the rollup (one row per month/type/category), so it
+        # stays cheap as the transactions table grows
+        return self._scalar("SELECT COALESCE(SUM(count), 0) FROM monthly_rollup")
+
+    def iter_transactions(self, chunk_rows):
+        # Own read connection, so a long export neither holds the shared lock
+        # nor materializes the whole table
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            cur = conn.execute(f"SELECT {', '.join(TXN_COLUMNS)} FROM transactions ORDER BY id")
+            while True:
+                rows = cur.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                yield [dict(r) for r in rows]
+        finally:
+            conn.close()
+
+    def add(self, txn):
+        self.extend([txn])
+
+    def extend(self, txns):
+        rows = [tuple(t.get(c) for c in TXN_COLUMNS) for t in txns]
+        # Fold the batch into rollup deltas first: one upsert per touched cell
+        deltas = LedgerAggregates(txns).rollup
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO transactions ({', '.join(TXN_COLUMNS)}) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._conn.executemany(ROLLUP_UPSERT, [(m, t, c, v, n) for (m, t, c), (v, n) in deltas.items()])
+            self._conn.execute(BUMP_VERSION)
+
+    def totals(self):
+        """Return (balance, income, expense)."""
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT COALESCE(SUM(amount), 0),
+                       COALESCE(SUM(CASE WHEN type = 'Income' THEN amount END), 0),
+                       COALESCE(SUM(CASE WHEN type = 'Expense' THEN amount END), 0)
+                FROM monthly_rollup
+                """
+            ).fetchone()
+        return tuple(row)
+
+    def rollup_frame(self):
+        return self._query(f"SELECT {', '.join(ROLLUP_COLUMNS)} FROM monthly_rollup")
+
+    def page(self, after=None, before=None, size=50):
+        """Return a TransactionPage using keyset pagination on (date, id)."""
+        cols = "id, " + ", ".join(TXN_COLUMNS)
+        if before is not None:
+            date, rowid = before
+            df = self._query(
+                f"SELECT {cols} FROM transactions WHERE date > ? OR (date = ? AND id > ?) "
+                "ORDER BY date ASC, id ASC LIMIT ?",
+                (date, date, rowid, size + 1),
+            )
+            has_prev = len(df) > size
+            df = df.head(size).iloc[::-1]
+            has_next = True
+        else:
+            where, params = "", ()
+            if after is not None:
+                date, rowid = after
+                where, params = "WHERE date < ? OR (date = ? AND id < ?) ", (date, date, rowid)
+            df = self._query(
+                f"SELECT {cols} FROM transactions {where}ORDER BY date DESC, id DESC LIMIT ?",
+                params + (size + 1,),
+            )
+            has_next = len(df) > size
+            df = df.head(size)
+            has_prev = after is not None
+
+        first = last = None
+        if len(df):
+            first = (df["date"].iloc[0], int(df["id"].iloc[0]))
+            last = (df["date"].iloc[-1], int(df["id"].iloc[-1]))
+        rows = df.drop(columns="id").reset_index(drop=True)
+        rows["date"] = pd.to_datetime(rows["date"]).dt.date
+        return TransactionPage(rows, first, last, has_prev, has_next)
+
+    def monthly_summary(self):
+        return monthly_from_rollup(self.rollup_frame())
+
+    def category_tree(self):
+        # The meta version also moves when other sessions write
+        version = self.version
+        if self._tree_cache is None or self._tree_cache[0] != version:
+            self._tree_cache = (version, CategoryTree(self.rollup_frame()))
+        return self._tree_cache[1]
+
+    # budgets
+    def budgets(self):
+        with self._lock:
+            return dict(self._conn.execute("SELECT category, amount FROM budgets").fetchall())
+
+    def set_budgets(self, budgets):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO budgets (category, amount) VALUES (?, ?) "
+                "ON CONFLICT (category) DO UPDATE SET amount = excluded.amount",
+                list(budgets.items()),
+            )
+
+    def spent(self, month, categories):
+        """Expense per category for a "YYYY-MM" month, read from the rollup table."""
+        with self._lock:
+            rows = dict(self._conn.execute(
+                "SELECT category, amount FROM monthly_rollup WHERE month = ? AND type = 'Expense'", (month,)
+            ).fetchall())
+        return {c: rows.get(c, 0.0) for c in categories}
+
+    def refresh(self):
+        # Queries always read the database, so there is nothing to reload
+        pass
+
+    # links
+    def links(self):
+        return self._query("SELECT name, url, tag, created FROM links ORDER BY id").to_dict("records")
+
+    def link_index(self):
+        version = self.version
+        if self._link_index is None or self._link_index[0] != version:
+            self._link_index = (version, LinkIndex(self.links()))
+        return self._link_index[1]
+
+    def add_link(self, entry):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO links (name, url, tag, created) VALUES (?, ?, ?, ?)",
+                (entry["name"], entry["url"], entry.get("tag"), entry.get("created")),
+            )
+            self._conn.execute(BUMP_VERSION)
+
+    def save(self):
+        # Every write is already committed
+        pass
+
+    def clear(self):
+        # meta (including the "seeded" flag) is kept, so the data stays cleared
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM transactions")
+            self._conn.execute("DELETE FROM monthly_rollup")
+            self._conn.execute("DELETE FROM links")
+            self._conn.execute(BUMP_VERSION)
+
+
+# -----------------------
+# Streaming exports
+# -----------------------
+# Exports are generated lazily in fixed-size chunks, so peak memory depends
+# on EXPORT_CHUNK_ROWS rather than on the size of the ledger.
+
+EXPORT_CHUNK_ROWS = 5000
+
+
+def iter_csv(ledger, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield the ledger as UTF-8 CSV bytes, one chunk per batch of rows."""
+    yield (",".join(TXN_COLUMNS) + "\n").encode("utf-8")
+    for chunk in ledger.iter_transactions(chunk_rows):
+        buf = io.StringIO()
+        csv.DictWriter(buf, TXN_COLUMNS, extrasaction="ignore", lineterminator="\n").writerows(chunk)
+        yield buf.getvalue().encode("utf-8")
+
+
+def iter_json(ledger, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield the ledger as an indented JSON array, one chunk per batch of rows."""
+    yield b"["
+    sep = "\n"
+    for chunk in ledger.iter_transactions(chunk_rows):
+        parts = []
+        for t in chunk:
+            parts.append(sep + "  " + json.dumps(t, indent=2).replace("\n", "\n  "))
+            sep = ",\n"
+        yield "".join(parts).encode("utf-8")
+    yield b"\n]" if sep != "\n" else b"]"
+
+
+def write_export(path, chunks):
+    """Stream chunks to a temp file, rename it over path and return path.
+
+    Another session exporting to the same path only ever sees a complete file.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return path
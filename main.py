@@ -2,7 +2,8 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import yfinance as yf
+from market_data import get_provider
+from quotes import get_quotes
 from datetime import datetime, timedelta
 import time
 
@@ -537,15 +538,20 @@ elif page == "Mock Portfolio":
             portfolio_data = []
             total_value = 0
             
+            # One batched, cached fetch for every holding
+            quotes = get_quotes(st.session_state.mock_portfolio.keys())
+            
             for ticker, details in st.session_state.mock_portfolio.items():
-                current_price = yf.Ticker(ticker + ".NS").history(period="1d")["Close"].iloc[-1]
+                # Unpriced holdings are valued at cost, flagged, and show no P/L
+                priced = ticker in quotes
+                current_price = quotes[ticker] if priced else details["avg_price"]
                 current_value = current_price * details["quantity"]
-                profit_loss = current_value - details["invested_amount"]
-                profit_loss_pct = (profit_loss / details["invested_amount"]) * 100
+                profit_loss = current_value - details["invested_amount"] if priced else None
+                profit_loss_pct = (profit_loss / details["invested_amount"]) * 100 if priced else None
                 total_value += current_value
                 
                 portfolio_data.append({
-                    "Asset": ticker,
+                    "Asset": ticker if priced else f"{ticker} (price unavailable)",
                     "Quantity": details["quantity"],
                     "Avg Price": details["avg_price"],
                     "Current Price": current_price,
@@ -563,7 +569,11 @@ elif page == "Mock Portfolio":
                 "Current Value": "₹{:.2f}",
                 "P/L": "₹{:.2f}",
                 "P/L %": "{:.2f}%"
-            }))
+            }, na_rep="—"))
+            
+            unpriced = [t for t in st.session_state.mock_portfolio if t not in quotes]
+            if unpriced:
+                st.warning(f"Could not fetch prices for {', '.join(unpriced)}; shown at average cost.")
             
             # Update portfolio value
             st.session_state.portfolio_value = total_value + (st.session_state.portfolio_value - sum([d["invested_amount"] for d in st.session_state.mock_portfolio.values()]))
@@ -592,8 +602,7 @@ elif page == "Mock Portfolio":
                 if ticker:
                     try:
                         # Get current price
-                        stock = yf.Ticker(ticker + ".NS")
-                        hist = stock.history(period="1d")
+                        hist = get_provider().history(ticker + ".NS", period="1d")
                         current_price = hist["Close"].iloc[-1]
                         
                         investment_amount = current_price * quantity
@@ -639,10 +648,13 @@ elif page == "Mock Portfolio":
         labels = []
         sizes = []
         
+        # Served from the quote cache filled by the holdings table above
+        quotes = get_quotes(st.session_state.mock_portfolio.keys())
+        
         for ticker, details in st.session_state.mock_portfolio.items():
-            current_price = yf.Ticker(ticker + ".NS").history(period="1d")["Close"].iloc[-1]
+            current_price = quotes.get(ticker, details["avg_price"])
             current_value = current_price * details["quantity"]
-            labels.append(ticker)
+            labels.append(ticker if ticker in quotes else f"{ticker} (at cost)")
             sizes.append(current_value)
         
         # Add cash position
@@ -0,0 +1,144 @@
+import os
+import time
+from functools import lru_cache
+
+import pandas as pd
+
+# -----------------------
+# Market data providers
+# -----------------------
+# Page code asks a provider for OHLC bars instead of calling yfinance
+# directly. The yfinance provider talks to the network; the replay provider
+# serves bars from local Parquet/CSV files (one file per symbol, e.g.
+# RELIANCE.NS.csv) with an optional artificial latency, so portfolio pages
+# can be load-tested and benchmarked on a machine without network access.
+#
+# Selected through environment variables:
+#   MARKET_DATA_PROVIDER    "yfinance" (default) or "replay"
+#   MARKET_DATA_DIR         directory holding the replay files
+#   MARKET_DATA_LATENCY_MS  simulated per-request latency for replay
+
+OHLC_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Approximate trading bars per yfinance period string
+PERIOD_BARS = {
+    "1d": 1,
+    "5d": 5,
+    "1mo": 21,
+    "3mo": 63,
+    "6mo": 126,
+    "1y": 252,
+    "2y": 504,
+    "5y": 1260,
+    "10y": 2520,
+}
+
+
+class MarketDataProvider:
+    """Interface every market data backend implements."""
+
+    def history(self, symbol, period="1d", timeout=None):
+        """Return OHLC bars for symbol (empty DataFrame if unknown).
+
+        timeout (seconds) bounds the request; exceeding it raises.
+        """
+        raise NotImplementedError
+
+    def last_closes(self, symbols):
+        """Return {symbol: last close} for every symbol that could be priced."""
+        closes = {}
+        for sym in symbols:
+            hist = self.history(sym, period="1d")
+            if not hist.empty:
+                closes[sym] = float(hist["Close"].iloc[-1])
+        return closes
+
+
+class YFinanceProvider(MarketDataProvider):
+    def history(self, symbol, period="1d", timeout=None):
+        import yfinance as yf
+
+        if timeout is None:
+            return yf.Ticker(symbol).history(period=period)
+        return yf.Ticker(symbol).history(period=period, timeout=timeout, raise_errors=True)
+
+    def last_closes(self, symbols):
+        import yfinance as yf
+
+        symbols = list(symbols)
+        if not symbols:
+            return {}
+
+        # One batched request for every symbol
+        data = yf.download(symbols, period="1d", progress=False, auto_adjust=False)
+        if data is None or data.empty:
+            return {}
+
+        closes = data["Close"]
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(name=symbols[0])
+
+        last = closes.ffill().iloc[-1]
+        return {sym: float(price) for sym, price in last.items() if pd.notna(price)}
+
+
+class ReplayProvider(MarketDataProvider):
+    def __init__(self, data_dir, latency=0.0):
+        self.data_dir = data_dir
+        self.latency = latency
+        self._frames = {}
+
+    def _load(self, symbol):
+        if symbol in self._frames:
+            return self._frames[symbol]
+
+        frame = pd.DataFrame(columns=OHLC_COLUMNS)
+        parquet_path = os.path.join(self.data_dir, symbol + ".parquet")
+        csv_path = os.path.join(self.data_dir, symbol + ".csv")
+        if os.path.exists(parquet_path):
+            frame = pd.read_parquet(parquet_path)
+        elif os.path.exists(csv_path):
+            frame = pd.read_csv(csv_path)
+
+        if "Date" in frame.columns:
+            frame = frame.set_index(pd.to_datetime(frame.pop("Date")))
+        frame = frame.sort_index()
+
+        self._frames[symbol] = frame
+        return frame
+
+    def _wait(self, timeout=None):
+        if timeout is not None and self.latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Replay request exceeded {timeout}s")
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def history(self, symbol, period="1d", timeout=None):
+        self._wait(timeout)
+        frame = self._load(symbol)
+        bars = PERIOD_BARS.get(period)
+        if bars is None:
+            return frame.copy()
+        return frame.iloc[-bars:].copy()
+
+    def last_closes(self, symbols):
+        # A batched request pays the latency once, like a real batch call
+        self._wait()
+        closes = {}
+        for sym in symbols:
+            frame = self._load(sym)
+            if not frame.empty:
+                closes[sym] = float(frame["Close"].iloc[-1])
+        return closes
+
+
+@lru_cache(maxsize=1)
+def get_provider():
+    """Return the process-wide provider chosen by the environment."""
+    kind = os.environ.get("MARKET_DATA_PROVIDER", "yfinance").lower()
+    if kind == "replay":
+        data_dir = os.environ.get("MARKET_DATA_DIR", "./market_data")
+        latency_ms = float(os.environ.get("MARKET_DATA_LATENCY_MS", "0"))
+        return ReplayProvider(data_dir, latency=latency_ms / 1000.0)
+    return YFinanceProvider()
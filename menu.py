@@ -1,9 +1,14 @@
 import streamlit as st
-import pandas as pd
 import json
 import os
+import tempfile
 from datetime import datetime
 import plotly.express as px
+from importer import parse_portfolio, parse_statement
+from ledger import (
+    JsonLedger, SQLiteLedger, TransactionLog, adopt_shared_files, budget_status, iter_csv, iter_json,
+    partition_dir, write_export,
+)
 
 # -----------------------
 # Streamlit Financial Menu
@@ -30,43 +35,78 @@ st.markdown(
 )
 
 DATA_DIR = "./.streamlit_data"
-LINKS_FILE = os.path.join(DATA_DIR, "links.json")
-TRANS_FILE = os.path.join(DATA_DIR, "transactions.json")
+USERS_DIR = os.path.join(DATA_DIR, "users")  # one partition directory per user
+DEFAULT_USER = "default"
+LINKS_RENDER_LIMIT = 500
+
+# "json" (default) keeps the ledger in memory; "sqlite" keeps it in an indexed database
+BACKEND = os.environ.get("FINANCE_HUB_BACKEND", "json").lower()
 
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR, exist_ok=True)
 
 # ---- Utilities ----
 
-def load_json(path, default):
-    try:
-        with open(path, "r") as f:
-            return json.load(f)
-    except Exception:
-        return default
-
-
-def save_json(path, data):
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+def open_ledger(user_id):
+    # Only the active user's partition is ever read
+    user_dir = partition_dir(USERS_DIR, user_id)
+    if user_id == DEFAULT_USER:
+        # Data saved before partitioning belongs to the default user
+        adopt_shared_files(DATA_DIR, user_dir)
+    os.makedirs(os.path.join(user_dir, "exports"), exist_ok=True)
+
+    links_file = os.path.join(user_dir, "links.json")
+    txn_log = TransactionLog(os.path.join(user_dir, "transactions.jsonl"))
+    txn_log.migrate_from(os.path.join(user_dir, "transactions.json"))
+    if BACKEND == "sqlite":
+        ledger = SQLiteLedger(os.path.join(user_dir, "finance.db"))
+        ledger.migrate_from(txn_log, links_file)
+    else:
+        ledger = JsonLedger(
+            txn_log, links_file, os.path.join(user_dir, "rollup.json"), os.path.join(user_dir, "budgets.json")
+        )
+    ledger.data_dir = user_dir
+    return ledger
+
+
+def export_button(label, key, chunks_fn, file_name, mime):
+    # Build the export only when asked, streaming it to a private temp file.
+    # download_button reads it in, then the file is removed, so no copy of
+    # the ledger is left behind and later reruns never load it again; press
+    # Prepare again for a fresh copy.
+    if st.button(f"Prepare {label}", key=f"prepare_{key}"):
+        fd, export_path = tempfile.mkstemp(dir=os.path.join(ledger.data_dir, "exports"), suffix="-" + file_name)
+        os.close(fd)
+        try:
+            with open(write_export(export_path, chunks_fn(ledger)), "rb") as f:
+                st.download_button(f"Download {label}", data=f, file_name=file_name, mime=mime, key=f"download_{key}")
+        finally:
+            os.remove(export_path)
 
 
-# Initialize session state
-if "links" not in st.session_state:
-    st.session_state.links = load_json(LINKS_FILE, [])
+# ---- Sidebar menu ----
+st.sidebar.title("Finance Hub")
+user_id = st.sidebar.text_input("User ID", value=st.session_state.get("user_id", DEFAULT_USER)).strip() or DEFAULT_USER
 
-if "transactions" not in st.session_state:
-    st.session_state.transactions = load_json(TRANS_FILE, [])
+# Initialize session state; switching user swaps in that user's partition
+if st.session_state.get("user_id") != user_id:
+    try:
+        ledger = open_ledger(user_id)
+    except ValueError as e:
+        st.sidebar.error(str(e))
+        st.stop()
+    st.session_state.user_id = user_id
+    st.session_state.ledger = ledger
+    st.session_state.txn_cursor = None
 
+ledger = st.session_state.ledger
+ledger.refresh()  # pick up writes made by other sessions of the same user
 
-# ---- Sidebar menu ----
-st.sidebar.title("Finance Hub")
 menu = st.sidebar.radio("Navigate", ["Dashboard", "Transactions", "Budgets", "Investments", "Links", "Reports", "Settings"]) 
 
 st.sidebar.markdown("---")
 if st.sidebar.button("Save data to disk"):
-    save_json(LINKS_FILE, st.session_state.links)
-    save_json(TRANS_FILE, st.session_state.transactions)
+    ledger.save()
     st.sidebar.success("Saved ✅")
 
 st.sidebar.caption("Built with Streamlit — customize freely")
@@ -79,9 +119,7 @@ if menu == "Dashboard":
     col1, col2, col3 = st.columns([1, 2, 1])
 
     # simple KPIs
-    total_balance = sum([t["amount"] for t in st.session_state.transactions]) if st.session_state.transactions else 0
-    income = sum([t["amount"] for t in st.session_state.transactions if t["type"] == "Income"]) if st.session_state.transactions else 0
-    expense = sum([t["amount"] for t in st.session_state.transactions if t["type"] == "Expense"]) if st.session_state.transactions else 0
+    total_balance, income, expense = ledger.totals()
 
     col1.metric("Total balance", f"₹{total_balance:,.2f}")
     col2.metric("Income (total)", f"₹{income:,.2f}")
@@ -91,10 +129,8 @@ if menu == "Dashboard":
 
     # Recent transactions table
     st.subheader("Recent transactions")
-    if st.session_state.transactions:
-        df = pd.DataFrame(st.session_state.transactions)
-        df["date"] = pd.to_datetime(df["date"]).dt.date
-        st.dataframe(df.sort_values(by="date", ascending=False).head(10).reset_index(drop=True))
+    if ledger.count():
+        st.dataframe(ledger.page(size=10).rows)
     else:
         st.info("No transactions yet. Add some under the Transactions tab.")
 
@@ -102,10 +138,8 @@ if menu == "Dashboard":
 
     # Simple chart
     st.subheader("Monthly snapshot (sample)")
-    if st.session_state.transactions:
-        dfc = pd.DataFrame(st.session_state.transactions)
-        dfc["date"] = pd.to_datetime(dfc["date"]).dt.to_period("M").dt.to_timestamp()
-        summary = dfc.groupby(["date", "type"]).amount.sum().reset_index()
+    if ledger.count():
+        summary = ledger.monthly_summary()
         fig = px.bar(summary, x="date", y="amount", color="type", barmode="group", title="Income vs Expense by Month")
         st.plotly_chart(fig, use_container_width=True)
     else:
@@ -131,18 +165,48 @@ elif menu == "Transactions":
         submitted = st.form_submit_button("Add transaction")
         if submitted:
             txn = {"type": ttype, "amount": float(amount), "category": category, "date": date.isoformat(), "notes": notes}
-            st.session_state.transactions.append(txn)
-            save_json(TRANS_FILE, st.session_state.transactions)
+            ledger.add(txn)
+            st.session_state.txn_cursor = None
             st.success("Transaction added")
 
+    with st.expander("Bulk import from bank statement (CSV / OFX)"):
+        statement = st.file_uploader("Statement file", type=["csv", "ofx", "qfx"])
+        if statement is not None and st.button("Import transactions"):
+            try:
+                valid, rejected = parse_statement(statement.getvalue(), statement.name)
+            except Exception as e:
+                st.error(f"Could not read statement: {e}")
+            else:
+                # One batch write for the whole statement
+                ledger.extend(valid.to_dict("records"))
+                st.session_state.txn_cursor = None
+                st.success(f"Imported {len(valid):,} transactions")
+                if len(rejected):
+                    st.warning(f"Skipped {len(rejected):,} invalid rows")
+                    st.dataframe(rejected.head(100))
+
     st.markdown("---")
     st.subheader("All transactions")
-    if st.session_state.transactions:
-        df = pd.DataFrame(st.session_state.transactions)
-        df["date"] = pd.to_datetime(df["date"]).dt.date
-        st.dataframe(df.sort_values(by="date", ascending=False).reset_index(drop=True))
-        csv = df.to_csv(index=False).encode("utf-8")
-        st.download_button("Download CSV", data=csv, file_name="transactions.csv", mime="text/csv")
+    if ledger.count():
+        # Only the visible page is fetched and sent to the browser
+        page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1)
+        if st.session_state.get("txn_page_size") != page_size:
+            st.session_state.txn_page_size = page_size
+            st.session_state.txn_cursor = None
+        cursor = st.session_state.get("txn_cursor")  # None, ("after", key) or ("before", key)
+        page = ledger.page(size=page_size, **({cursor[0]: cursor[1]} if cursor else {}))
+        st.dataframe(page.rows, use_container_width=True)
+
+        prev_col, info_col, next_col = st.columns([1, 2, 1])
+        if prev_col.button("← Newer", disabled=not page.has_prev):
+            st.session_state.txn_cursor = ("before", page.first)
+            st.rerun()
+        info_col.caption(f"{ledger.count():,} transactions in total")
+        if next_col.button("Older →", disabled=not page.has_next):
+            st.session_state.txn_cursor = ("after", page.last)
+            st.rerun()
+
+        export_button("CSV", "txn_csv", iter_csv, "transactions.csv", "text/csv")
     else:
         st.info("No transactions yet — use the form above to add some.")
 
@@ -150,15 +214,32 @@ elif menu == "Transactions":
 # --- Budgets ---
 elif menu == "Budgets":
     st.title("Budgets")
-    st.info("Simple, local budget placeholders — extend this with persistence or connect to your db.")
+    st.info("Monthly budgets per expense category, compared against what you've actually spent.")
+    saved = ledger.budgets()
     categories = ["Food", "Rent", "Utilities", "Transport", "Entertainment"]
-    bud = {c: st.number_input(f"Budget for {c} (₹)", min_value=0.0, value=0.0) for c in categories}
-    if st.button("Save budgets (session-only)"):
-        st.session_state.budgets = bud
-        st.success("Saved to session state")
+    categories += [c for c in saved if c not in categories]
+    bud = {c: st.number_input(f"Budget for {c} (₹)", min_value=0.0, value=float(saved.get(c, 0.0))) for c in categories}
+    if st.button("Save budgets"):
+        ledger.set_budgets(bud)
+        saved = bud
+        st.success("Budgets saved")
 
-    if "budgets" in st.session_state:
-        st.write(st.session_state.budgets)
+    st.markdown("---")
+    st.subheader("Budget vs actual")
+    month = st.date_input("Month", value=datetime.today()).strftime("%Y-%m")
+    # Spend comes from the maintained monthly counters, not a scan of the ledger
+    status = budget_status(saved, ledger.spent(month, saved))
+    if len(status):
+        st.dataframe(status.style.format({
+            "budget": "₹{:,.2f}", "spent": "₹{:,.2f}", "remaining": "₹{:,.2f}", "utilization": "{:.0%}",
+        }, na_rep="—"))
+        for row in status.itertuples():
+            if row.status == "Over budget":
+                st.error(f"{row.category}: over budget by ₹{-row.remaining:,.2f}")
+            elif row.status == "Near limit":
+                st.warning(f"{row.category}: {row.utilization:.0%} of budget used")
+    else:
+        st.caption("Save some budgets to start tracking them.")
 
 
 # --- Investments ---
@@ -166,25 +247,19 @@ elif menu == "Investments":
     st.title("Investments")
     st.write("Track assets or paste a small portfolio below (CSV style: name,quantity,price)")
     portfolio_text = st.text_area("Paste portfolio (CSV) or leave empty for sample", value="")
+    portfolio_file = st.file_uploader("...or upload a portfolio CSV", type=["csv", "txt"])
     if st.button("Parse portfolio"):
-        if portfolio_text.strip():
-            lines = [l.strip() for l in portfolio_text.splitlines() if l.strip()]
-            rows = []
-            for l in lines:
-                parts = [p.strip() for p in l.split(",")]
-                if len(parts) >= 3:
-                    name, qty, price = parts[:3]
-                    try:
-                        rows.append({"name": name, "qty": float(qty), "price": float(price)})
-                    except:
-                        st.warning(f"Skipping invalid row: {l}")
-            if rows:
-                df = pd.DataFrame(rows)
-                df["value"] = df.qty * df.price
+        source = portfolio_file.getvalue() if portfolio_file is not None else portfolio_text
+        if (source.strip() if isinstance(source, str) else source):
+            df, invalid = parse_portfolio(source)
+            if len(df):
                 st.dataframe(df)
                 st.metric("Portfolio value", f"₹{df['value'].sum():,.2f}")
             else:
                 st.info("No valid rows parsed.")
+            if len(invalid):
+                st.warning(f"Skipped {len(invalid):,} invalid rows")
+                st.dataframe(invalid)
         else:
             st.info("Paste CSV lines to parse.")
 
@@ -202,30 +277,28 @@ elif menu == "Links":
         if add:
             if name and url:
                 entry = {"name": name, "url": url, "tag": tag, "created": datetime.now().isoformat()}
-                st.session_state.links.append(entry)
-                save_json(LINKS_FILE, st.session_state.links)
+                ledger.add_link(entry)
                 st.success("Link added ✅")
             else:
                 st.error("Please provide both a name and a URL.")
 
     st.markdown("---")
     st.subheader("Saved links")
-    if st.session_state.links:
-        # filter
-        tags = [l.get("tag", "Other") for l in st.session_state.links]
-        uniq = ["All"] + sorted(list(set(tags)))
-        sel = st.selectbox("Filter by tag", uniq)
-
-        for i, l in enumerate(st.session_state.links):
-            if sel != "All" and l.get("tag") != sel:
-                continue
-            st.markdown(
-                f"<div class='link-card'><strong>{l['name']}</strong> <span class='muted'>({l.get('tag','')})</span><br/><a href='{l['url']}' target='_blank'>{l['url']}</a></div>",
-                unsafe_allow_html=True,
-            )
+    index = ledger.link_index()
+    links = index.links
+    if links:
+        # filter through the tag / token index
+        col1, col2 = st.columns([2, 1])
+        query = col1.text_input("Search links", placeholder="name or URL, prefixes work")
+        sel = col2.selectbox("Filter by tag", ["All"] + index.tags())
+
+        matches = index.search(query, None if sel == "All" else sel)
+        shown = matches[:LINKS_RENDER_LIMIT]
+        st.caption(f"{len(matches):,} of {len(links):,} links" + (f" — showing first {len(shown):,}" if len(shown) < len(matches) else ""))
+        st.markdown(index.render(shown), unsafe_allow_html=True)
 
         if st.button("Export links as JSON"):
-            st.download_button("Download links.json", data=json.dumps(st.session_state.links, indent=2), file_name="links.json")
+            st.download_button("Download links.json", data=json.dumps(links, indent=2), file_name="links.json")
     else:
         st.info("No links yet — add one using the form above.")
 
@@ -235,17 +308,19 @@ elif menu == "Reports":
     st.title("Reports")
     st.write("Quick charts & simple exportable reports")
 
-    if st.session_state.transactions:
-        df = pd.DataFrame(st.session_state.transactions)
-        df["date"] = pd.to_datetime(df["date"]).dt.date
-        by_cat = df.groupby(["category", "type"]).amount.sum().reset_index()
+    if ledger.count():
+        tree = ledger.category_tree()
+        start, end = tree.months[0], tree.months[-1]
+        if len(tree.months) > 1:
+            start, end = st.select_slider("Months", options=tree.months, value=(start, end))
+        by_cat = tree.query(start, end)
         st.subheader("Spending / Income by category")
-        fig = px.sunburst(by_cat, path=["type", "category"], values="amount")
+        fig = px.sunburst(by_cat, path=["type", "category"], values="amount", hover_data=["count"])
         st.plotly_chart(fig, use_container_width=True)
 
         st.markdown("---")
         st.subheader("Export reports")
-        st.download_button("Download transactions JSON", data=json.dumps(st.session_state.transactions, indent=2), file_name="transactions.json")
+        export_button("transactions JSON", "txn_json", iter_json, "transactions.json", "application/json")
     else:
         st.info("No transactions to report on yet.")
 
@@ -256,13 +331,8 @@ elif menu == "Settings":
     st.write("App-level options")
 
     if st.button("Clear all data (links + transactions)"):
-        st.session_state.links = []
-        st.session_state.transactions = []
         try:
-            if os.path.exists(LINKS_FILE):
-                os.remove(LINKS_FILE)
-            if os.path.exists(TRANS_FILE):
-                os.remove(TRANS_FILE)
+            ledger.clear()
         except Exception:
             pass
         st.success("Data cleared from session and disk.")
@@ -276,7 +346,7 @@ elif menu == "Settings":
             st.success("Applied (simulated) — you can add your own CSS")
     with cols[1]:
         st.write("Streaming tip:")
-        st.caption("Right now this app saves to a local folder .streamlit_data — for multi-user use, connect to a DB.")
+        st.caption("Data is saved per user under .streamlit_data/users/<user id> — set FINANCE_HUB_BACKEND=sqlite to use a SQLite database per user instead.")
 
     st.markdown("---")
     st.caption("Made with ❤ — customise icons, colors, and persistence as you like.")
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import streamlit as st
+
+from market_data import get_provider
+
+# -----------------------
+# Quote service
+# -----------------------
+# Shared helper for the Mock Portfolio pages. Every held symbol is fetched
+# in one batched request and the result is cached for a short TTL, so the
+# holdings table, the allocation chart and every other session looking at
+# the same symbols reuse a single round trip.
+
+QUOTE_TTL_SECONDS = 60
+EXCHANGE_SUFFIX = ".NS"
+
+
+@st.cache_data(ttl=QUOTE_TTL_SECONDS, show_spinner=False)
+def _fetch_last_closes(symbols):
+    return get_provider().last_closes(symbols)
+
+
+def get_quotes(tickers, suffix=EXCHANGE_SUFFIX):
+    """Return {ticker: last close} for every ticker that could be priced."""
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+
+    # Sorted tuple keeps the cache key stable regardless of holding order
+    symbols = tuple(sorted(t + suffix for t in tickers))
+    closes = _fetch_last_closes(symbols)
+    return {t: closes[t + suffix] for t in tickers if t + suffix in closes}
+
+
+# -----------------------
+# Concurrent per-symbol fetching
+# -----------------------
+# Each symbol is fetched on its own worker thread and all fetches share one
+# deadline, so a page waits at most QUOTE_TIMEOUT_SECONDS no matter how many
+# symbols are held. Symbols that miss the deadline or fail fall back to the
+# last price we saw for them, flagged as stale. A fetch still running from an
+# earlier render is waited on again rather than submitted twice, and every
+# provider call is bounded by FETCH_TIMEOUT_SECONDS so a hung symbol cannot
+# hold a worker forever.
+
+QUOTE_TIMEOUT_SECONDS = 5
+FETCH_TIMEOUT_SECONDS = 10
+
+Quote = namedtuple("Quote", ["price", "stale"])
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="quote-fetch")
+_last_good = {}  # symbol -> (price, fetched_at)
+_last_good_lock = threading.Lock()
+_in_flight = {}  # symbol -> future of the fetch currently running for it
+# Reentrant: a future that is already done runs its callback on the submitting thread
+_in_flight_lock = threading.RLock()
+
+
+def _fetch_one(symbol):
+    hist = get_provider().history(symbol, period="1d", timeout=FETCH_TIMEOUT_SECONDS)
+    price = float(hist["Close"].iloc[-1])
+    with _last_good_lock:
+        _last_good[symbol] = (price, time.time())
+    return price
+
+
+def _submit(symbol):
+    with _in_flight_lock:
+        future = _in_flight.get(symbol)
+        if future is None:
+            future = _executor.submit(_fetch_one, symbol)
+            _in_flight[symbol] = future
+            future.add_done_callback(lambda f: _finished(symbol, f))
+        return future
+
+
+def _finished(symbol, future):
+    with _in_flight_lock:
+        if _in_flight.get(symbol) is future:
+            del _in_flight[symbol]
+
+
+def fetch_quotes_concurrent(tickers, suffix=EXCHANGE_SUFFIX, timeout=QUOTE_TIMEOUT_SECONDS):
+    """Return {ticker: Quote} for every ticker with a fresh or stale price."""
+    tickers = list(dict.fromkeys(tickers))
+    now = time.time()
+    results = {}
+    pending = {}
+
+    with _last_good_lock:
+        cached = dict(_last_good)
+
+    for t in tickers:
+        hit = cached.get(t + suffix)
+        if hit is not None and now - hit[1] < QUOTE_TTL_SECONDS:
+            results[t] = Quote(hit[0], False)
+        else:
+            pending[_submit(t + suffix)] = t
+
+    # Late fetches keep running and refresh _last_good for the next render
+    done, _ = wait(pending, timeout=timeout)
+
+    for future, t in pending.items():
+        if future in done and future.exception() is None:
+            results[t] = Quote(future.result(), False)
+        elif t + suffix in cached:
+            results[t] = Quote(cached[t + suffix][0], True)
+
+    return results
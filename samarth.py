@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import yfinance as yf
+from market_data import get_provider
+from quotes import fetch_quotes_concurrent
 from datetime import datetime, timedelta
 import time
 
@@ -546,9 +547,12 @@ elif page == "Mock Portfolio":
             total_invested = 0
             total_current = 0
             
+            # Fetch every holding concurrently; slow symbols fall back to their last price
+            quotes = fetch_quotes_concurrent(st.session_state.mock_portfolio.keys())
+            
             for ticker, details in st.session_state.mock_portfolio.items():
-                try:
-                    current_price = yf.Ticker(ticker + ".NS").history(period="1d")["Close"].iloc[-1]
+                if ticker in quotes:
+                    current_price, stale = quotes[ticker]
                     current_value = current_price * details["quantity"]
                     profit_loss = current_value - details["invested_amount"]
                     profit_loss_pct = (profit_loss / details["invested_amount"]) * 100
@@ -560,12 +564,12 @@ elif page == "Mock Portfolio":
                     <div class='portfolio-item'>
                         <h4>{ticker}</h4>
                         <p>Quantity: {details["quantity"]} | Avg Price: ₹{details["avg_price"]:.2f}</p>
-                        <p>Current Price: ₹{current_price:.2f} | Invested: ₹{details["invested_amount"]:.2f}</p>
+                        <p>Current Price: ₹{current_price:.2f}{" (stale)" if stale else ""} | Invested: ₹{details["invested_amount"]:.2f}</p>
                         <p>Current Value: ₹{current_value:.2f} | P/L: ₹{profit_loss:.2f} ({profit_loss_pct:.2f}%)</p>
                     </div>
                     """, unsafe_allow_html=True)
                 
-                except:
+                else:
                     st.markdown(f"""
                     <div class='portfolio-item'>
                         <h4>{ticker}</h4>
@@ -610,8 +614,7 @@ elif page == "Mock Portfolio":
                 if ticker:
                     try:
                         # Get current price
-                        stock = yf.Ticker(ticker + ".NS")
-                        hist = stock.history(period="1d")
+                        hist = get_provider().history(ticker + ".NS", period="1d")
                         current_price = hist["Close"].iloc[-1]
                         
                         investment_amount = current_price * quantity
@@ -661,8 +664,7 @@ elif page == "Mock Portfolio":
                 if submitted_sell:
                     try:
                         # Get current price
-                        stock = yf.Ticker(ticker_to_sell + ".NS")
-                        hist = stock.history(period="1d")
+                        hist = get_provider().history(ticker_to_sell + ".NS", period="1d")
                         current_price = hist["Close"].iloc[-1]
                         
                         sale_value = current_price * quantity_to_sell
@@ -698,14 +700,13 @@ elif page == "Mock Portfolio":
         allocation_data = []
         total_value = 0
         
+        quotes = fetch_quotes_concurrent(st.session_state.mock_portfolio.keys())
+        
         for ticker, details in st.session_state.mock_portfolio.items():
-            try:
-                current_price = yf.Ticker(ticker + ".NS").history(period="1d")["Close"].iloc[-1]
-                current_value = current_price * details["quantity"]
+            if ticker in quotes:
+                current_value = quotes[ticker].price * details["quantity"]
                 total_value += current_value
                 allocation_data.append({"Asset": ticker, "Value": current_value, "Percentage": 0})
-            except:
-                pass
         
         # Add cash position
         cash = st.session_state.portfolio_value - total_value
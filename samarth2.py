@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+from simulator import MarketSimulator, SharedMarket
 from datetime import datetime, timedelta
 import time
 
@@ -80,7 +81,7 @@ if 'portfolio_value' not in st.session_state:
 if 'portfolio_history' not in st.session_state:
     st.session_state.portfolio_history = []
 
-# Sample stock data (simulated)
+# Sample stock data (simulated) — seeds the shared market below
 stock_data = {
     "RELIANCE": {"name": "Reliance Industries", "price": 2750.50, "volatility": 0.02},
     "TCS": {"name": "Tata Consultancy Services", "price": 3850.75, "volatility": 0.015},
@@ -91,11 +92,17 @@ stock_data = {
     "GOLDBEES": {"name": "Gold ETF", "price": 55.30, "volatility": 0.008},
 }
 
-# Function to simulate price changes
-def update_prices():
-    for ticker, data in stock_data.items():
-        change = np.random.normal(0, data["volatility"])
-        stock_data[ticker]["price"] = max(data["price"] * (1 + change), data["price"] * 0.8)
+MARKET_TICK_SECONDS = 5
+
+# One simulated market per process, shared by every session and advanced
+# by a background clock instead of per-session button clicks
+@st.cache_resource
+def get_market():
+    market = SharedMarket(MarketSimulator.from_dict(stock_data))
+    market.start_clock(MARKET_TICK_SECONDS)
+    return market
+
+market = get_market()
 
 # Navigation
 st.sidebar.title("InvestWise Navigation")
@@ -548,10 +555,10 @@ elif page == "Risk Assessment":
 elif page == "Mock Portfolio":
     st.markdown('<h1 class="main-header">Mock Investment Portfolio</h1>', unsafe_allow_html=True)
     
-    # Update prices to simulate market changes
-    if st.button("Update Prices"):
-        update_prices()
-        st.success("Prices updated!")
+    # Prices move on a shared background clock; refreshing just re-reads them
+    if st.button("Refresh Prices"):
+        st.success("Prices refreshed!")
+    st.caption(f"Simulated market ticks every {MARKET_TICK_SECONDS} seconds for all users.")
     
     st.info("Practice investing with virtual money. Start with ₹10,000 to build your portfolio.")
     
@@ -569,7 +576,7 @@ elif page == "Mock Portfolio":
             
             for ticker, details in st.session_state.mock_portfolio.items():
                 if ticker in stock_data:
-                    current_price = stock_data[ticker]["price"]
+                    current_price = market.price(ticker)
                     current_value = current_price * details["quantity"]
                     profit_loss = current_value - details["invested_amount"]
                     profit_loss_pct = (profit_loss / details["invested_amount"]) * 100
@@ -629,7 +636,7 @@ elif page == "Mock Portfolio":
             if submitted:
                 if ticker:
                     try:
-                        current_price = stock_data[ticker]["price"]
+                        current_price = market.price(ticker)
                         investment_amount = current_price * quantity
                         
                         if investment_amount > st.session_state.portfolio_value:
@@ -677,7 +684,7 @@ elif page == "Mock Portfolio":
                 if submitted_sell:
                     try:
                         if ticker_to_sell in stock_data:
-                            current_price = stock_data[ticker_to_sell]["price"]
+                            current_price = market.price(ticker_to_sell)
                         else:
                             # Use average price if stock data not available
                             current_price = st.session_state.mock_portfolio[ticker_to_sell]["avg_price"]
@@ -717,7 +724,7 @@ elif page == "Mock Portfolio":
         
         for ticker, details in st.session_state.mock_portfolio.items():
             if ticker in stock_data:
-                current_price = stock_data[ticker]["price"]
+                current_price = market.price(ticker)
                 current_value = current_price * details["quantity"]
                 total_value += current_value
                 allocation_data.append({"Asset": f"{ticker} ({stock_data[ticker]['name']})", "Value": current_value, "Percentage": 0})
@@ -747,13 +754,22 @@ elif page == "Mock Portfolio":
         
         # Performance information
         st.subheader("Portfolio Performance")
-        st.info("""
-        In a full implementation, this section would show:
-        - Historical performance charts
-        - Comparison to benchmark indices
-        - Detailed analytics on your portfolio
-        - Risk metrics and diversification analysis
-        """)
+        held = [t for t in st.session_state.mock_portfolio if t in market.index]
+        history = market.history_window([market.index[t] for t in held]) if held else None
+        if history is not None and history.shape[1] > 1:
+            # Mark current holdings to market over every recorded tick
+            quantities = np.array([st.session_state.mock_portfolio[t]["quantity"] for t in held], dtype=float)
+            values = quantities @ history + cash
+            st.line_chart(pd.DataFrame({"Portfolio Value": values}))
+            st.caption("Current holdings valued at each simulated price tick.")
+        else:
+            st.info("""
+            In a full implementation, this section would show:
+            - Historical performance charts
+            - Comparison to benchmark indices
+            - Detailed analytics on your portfolio
+            - Risk metrics and diversification analysis
+            """)
         
         # Reset portfolio button
         if st.button("Reset Portfolio"):
@@ -0,0 +1,154 @@
+import threading
+
+import numpy as np
+
+# -----------------------
+# Simulated market engine
+# -----------------------
+# Holds prices and volatilities as NumPy arrays and advances every
+# instrument at once with geometric Brownian motion. Shocks can optionally
+# be correlated through a correlation matrix (applied via its Cholesky
+# factor), so the mock market scales to thousands of symbols without a
+# Python loop per ticker. Every simulated tick is recorded in a fixed-size
+# PriceHistory ring buffer so charts and returns can read recent windows.
+# SharedMarket wraps one simulator for the whole process: updates happen
+# under a lock and on a background clock, so every session sees one market.
+
+
+class PriceHistory:
+    """Fixed-capacity ring buffer of prices, one row per instrument.
+
+    Each tick is written twice (at slot and slot + capacity), so the most
+    recent n ticks are always one contiguous slice and window() can return
+    a view instead of stitching the wrapped halves together.
+    """
+
+    def __init__(self, n_symbols, capacity=1024):
+        self.capacity = capacity
+        self._buf = np.empty((n_symbols, 2 * capacity), dtype=np.float64)
+        self._head = 0  # next slot to write
+        self.size = 0
+
+    def append(self, prices):
+        col = self._head
+        self._buf[:, col] = prices
+        self._buf[:, col + self.capacity] = prices
+        self._head = (col + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def extend(self, paths):
+        """Record a (n_steps, n_symbols) block of ticks in one write."""
+        paths = np.asarray(paths)[-self.capacity:]
+        n = len(paths)
+        cols = (self._head + np.arange(n)) % self.capacity
+        self._buf[:, cols] = paths.T
+        self._buf[:, cols + self.capacity] = paths.T
+        self._head = (self._head + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def window(self, row=None, n=None):
+        """View of the last n ticks (oldest first) for one row, or all rows."""
+        n = self.size if n is None else min(n, self.size)
+        end = self._head + self.capacity
+        if row is None:
+            return self._buf[:, end - n:end]
+        return self._buf[row, end - n:end]
+
+    def returns(self, row=None, n=None):
+        """Log returns over the last n ticks."""
+        return np.diff(np.log(self.window(row, n)), axis=-1)
+
+
+class MarketSimulator:
+    def __init__(self, tickers, prices, volatilities, drift=0.0, correlation=None,
+                 max_drop=0.2, seed=None, history_capacity=1024):
+        self.tickers = list(tickers)
+        self.index = {t: i for i, t in enumerate(self.tickers)}
+        self.prices = np.asarray(prices, dtype=np.float64).copy()
+        self.volatilities = np.asarray(volatilities, dtype=np.float64)
+        self.drift = np.broadcast_to(np.asarray(drift, dtype=np.float64), self.prices.shape)
+        # Largest single-step fall, matching the old max(price * (1 + change), price * 0.8)
+        self.min_log_return = np.log1p(-max_drop) if max_drop is not None else -np.inf
+        self.rng = np.random.default_rng(seed)
+
+        self._chol = None
+        if correlation is not None:
+            self._chol = np.linalg.cholesky(np.asarray(correlation, dtype=np.float64))
+
+        self.history = PriceHistory(len(self.tickers), history_capacity)
+        self.history.append(self.prices)
+
+    @classmethod
+    def from_dict(cls, stock_data, **kwargs):
+        """Build from the {ticker: {"price": ..., "volatility": ...}} layout used by the pages."""
+        tickers = list(stock_data)
+        prices = [stock_data[t]["price"] for t in tickers]
+        vols = [stock_data[t]["volatility"] for t in tickers]
+        return cls(tickers, prices, vols, **kwargs)
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def price(self, ticker):
+        return float(self.prices[self.index[ticker]])
+
+    def step(self, n_steps=1, dt=1.0):
+        """Advance every instrument n_steps; returns the (n_steps, n_symbols) price path."""
+        shocks = self.rng.standard_normal((n_steps, len(self.tickers)))
+        if self._chol is not None:
+            shocks = shocks @ self._chol.T
+
+        sigma = self.volatilities
+        log_returns = (self.drift - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * shocks
+        np.maximum(log_returns, self.min_log_return, out=log_returns)
+
+        paths = self.prices * np.exp(np.cumsum(log_returns, axis=0))
+        self.prices = paths[-1].copy()
+        self.history.extend(paths)
+        return paths
+
+
+class SharedMarket:
+    """Thread-safe, process-wide market advanced by a background clock."""
+
+    def __init__(self, simulator):
+        self._sim = simulator
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._clock = None
+        self.tickers = simulator.tickers
+        self.index = simulator.index
+
+    def start_clock(self, interval_seconds, steps_per_tick=1):
+        if self._clock is not None:
+            return
+        self._clock = threading.Thread(
+            target=self._run_clock,
+            args=(interval_seconds, steps_per_tick),
+            name="market-clock",
+            daemon=True,
+        )
+        self._clock.start()
+
+    def stop_clock(self):
+        self._stop.set()
+
+    def _run_clock(self, interval_seconds, steps_per_tick):
+        while not self._stop.wait(interval_seconds):
+            self.step(steps_per_tick)
+
+    def step(self, n_steps=1, dt=1.0):
+        with self._lock:
+            return self._sim.step(n_steps, dt)
+
+    def price(self, ticker):
+        with self._lock:
+            return self._sim.price(ticker)
+
+    def history_window(self, rows=None, n=None):
+        """Copy of the last n ticks for the given rows (all rows if None)."""
+        with self._lock:
+            window = self._sim.history.window(n=n)
+            if rows is None:
+                return window.copy()
+            return window[rows]